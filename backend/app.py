@@ -1,46 +1,69 @@
-from dotenv import load_dotenv
-import os
-
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env')) # Load .env file
+import time
 
 from flask import Flask
 from flask_cors import CORS
 from flask_mysqldb import MySQL
-from config import Config
 from flask_jwt_extended import JWTManager
 
-app = Flask(__name__)
-CORS(app)
-
-# Load configuration
-app.config.from_object(Config)
-
-# Initialize MySQL connection
-mysql = MySQL(app)
-app.extensions['mysql'] = mysql
-
-# Initialize JWT Manager
-jwt = JWTManager(app)
-
-# Register Blueprints
-# Authentication routes
-from routes.auth_routes import auth_bp
-app.register_blueprint(auth_bp, url_prefix="/api/auth")
-# Jobseeker and Employer routes
-from routes.jobseeker_routes import jobseeker_bp
-app.register_blueprint(jobseeker_bp, url_prefix="/api")
-from routes.employer_routes import employer_bp
-app.register_blueprint(employer_bp, url_prefix="/api/employer")
-# Job routes
-from routes.job_routes import jobs_bp
-app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
-# Admin routes
-from routes.admin_routes import admin_bp
-app.register_blueprint(admin_bp, url_prefix="/api/admin")
-
-@app.route('/')
-def home():
-    return {"message": "JobStack API is running"}
+from config import load_config
+
+
+# App factory. Nothing here touches the database: flask_mysqldb connects per app context,
+# replica connections are opened on first use, so the app can be built once in
+# a pre-fork server master (see gunicorn.conf.py) and every worker connects after fork.
+def create_app(config=None):
+    started = time.perf_counter()
+
+    app = Flask(__name__)
+    # Browsers may read the read-your-writes deadline so clients can echo it back (see models/db.py)
+    CORS(app, expose_headers=['X-Read-Your-Writes-Until'])
+
+    # Load configuration, from the environment and .env file unless given
+    app.config.from_object(config if config is not None else load_config())
+    # The app logger otherwise inherits the root logger's WARNING level and drops info messages
+    app.logger.setLevel(app.config.get('LOG_LEVEL') or 'INFO')
+
+    # Initialize MySQL extension
+    mysql = MySQL(app)
+    app.extensions['mysql'] = mysql
+
+    # Route GET reads to replicas when configured, keeping read-your-writes for recent writers
+    from models.db import close_replica_connection, track_writes
+    app.teardown_appcontext(close_replica_connection)
+    app.after_request(track_writes)
+
+    # `flask db upgrade` / `flask db check-indexes`
+    from utils.migrations import db_cli
+    app.cli.add_command(db_cli)
+
+    # Initialize JWT Manager
+    JWTManager(app)
+
+    # Register Blueprints
+    # Authentication routes
+    from routes.auth_routes import auth_bp
+    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    # Jobseeker and Employer routes
+    from routes.jobseeker_routes import jobseeker_bp
+    app.register_blueprint(jobseeker_bp, url_prefix="/api")
+    from routes.employer_routes import employer_bp
+    app.register_blueprint(employer_bp, url_prefix="/api/employer")
+    # Job routes
+    from routes.job_routes import jobs_bp
+    app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
+    # Admin routes
+    from routes.admin_routes import admin_bp
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+
+    @app.route('/')
+    def home():
+        return {"message": "JobStack API is running"}
+
+    # Startup time, to keep an eye on boot cost as features are added
+    app.config['STARTUP_SECONDS'] = time.perf_counter() - started
+    app.logger.info("App created in %.1f ms", app.config['STARTUP_SECONDS'] * 1000)
+    return app
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,8 @@
+# ASGI entry point, e.g. `uvicorn asgi:app --workers 4`, or under gunicorn with
+# `gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app`.
+# The list and search endpoints run as coroutines over aiomysql (routes/async_routes.py),
+# every other route is served by the Flask app on a thread pool.
+from app import create_app
+from routes.async_routes import create_asgi_app
+
+app = create_asgi_app(create_app())
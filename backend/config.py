@@ -1,10 +1,55 @@
 import os
 
+from dotenv import load_dotenv
+
+ENV_FILE = os.path.join(os.path.dirname(__file__), '.env')
+
+
+# Settings are read from the environment when Config() is instantiated, not at import time,
+# so create_app() can load the .env file first and missing optional values fall back to defaults
 class Config:
-    # Load environment variables from .env file
-    MYSQL_HOST = os.getenv("MYSQL_HOST")
-    MYSQL_USER = os.getenv("MYSQL_USER")
-    MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-    MYSQL_DB = os.getenv("MYSQL_DB")
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-    JWT_EXPIRY_SECONDS = int(os.getenv("JWT_EXPIRY_SECONDS"))
+    def __init__(self, env=None):
+        env = os.environ if env is None else env
+
+        self.MYSQL_HOST = env.get("MYSQL_HOST")
+        self.MYSQL_USER = env.get("MYSQL_USER")
+        self.MYSQL_PASSWORD = env.get("MYSQL_PASSWORD")
+        self.MYSQL_DB = env.get("MYSQL_DB")
+        # Read replicas as a comma-separated list of host[:port], GET requests are served from them.
+        # Two local instances work for testing, e.g. MYSQL_HOST=127.0.0.1 and MYSQL_REPLICA_HOSTS=127.0.0.1:3307
+        self.MYSQL_REPLICA_HOSTS = [h.strip() for h in env.get("MYSQL_REPLICA_HOSTS", "").split(",") if h.strip()]
+        # Connect timeout for replicas, and how long a replica that failed to connect is skipped
+        self.MYSQL_REPLICA_CONNECT_TIMEOUT = int(env.get("MYSQL_REPLICA_CONNECT_TIMEOUT", "1"))
+        self.MYSQL_REPLICA_RETRY_SECONDS = int(env.get("MYSQL_REPLICA_RETRY_SECONDS", "30"))
+        # Seconds after a write during which that user's reads stay on the primary
+        self.READ_YOUR_WRITES_SECONDS = int(env.get("READ_YOUR_WRITES_SECONDS", "5"))
+        # How long a lookup that found no recent write for a user is trusted, i.e. how stale
+        # read-your-writes may be for a client that does not echo X-Read-Your-Writes-Until
+        self.READ_YOUR_WRITES_CHECK_SECONDS = float(env.get("READ_YOUR_WRITES_CHECK_SECONDS", "1"))
+        # ASGI mode (asgi.py): aiomysql connections per database host and worker, and threads
+        # serving the routes that stay on the Flask app
+        self.ASYNC_DB_POOL_SIZE = int(env.get("ASYNC_DB_POOL_SIZE", "10"))
+        self.ASGI_WSGI_THREADS = int(env.get("ASGI_WSGI_THREADS", "10"))
+        # How often the in-process recommendation index catches up on job changes made by other
+        # workers, and how often it is fully reloaded to drop jobs deleted elsewhere
+        self.RECOMMENDER_REFRESH_SECONDS = int(env.get("RECOMMENDER_REFRESH_SECONDS", "10"))
+        self.RECOMMENDER_RELOAD_SECONDS = int(env.get("RECOMMENDER_RELOAD_SECONDS", "3600"))
+        # How long facet counts of unfiltered searches are cached
+        self.FACET_CACHE_SECONDS = int(env.get("FACET_CACHE_SECONDS", "60"))
+        # CSV of known places used to normalize job locations, defaults to data/gazetteer.csv
+        self.GAZETTEER_PATH = env.get("GAZETTEER_PATH")
+        # `flask jobs sweep`: open postings older than JOB_MAX_AGE_DAYS are closed (0 disables it),
+        # postings closed for ARCHIVE_AFTER_DAYS move to the archive tables, ARCHIVE_BATCH_SIZE jobs per transaction
+        self.JOB_MAX_AGE_DAYS = int(env.get("JOB_MAX_AGE_DAYS", "90"))
+        self.ARCHIVE_AFTER_DAYS = int(env.get("ARCHIVE_AFTER_DAYS", "30"))
+        self.ARCHIVE_BATCH_SIZE = int(env.get("ARCHIVE_BATCH_SIZE", "500"))
+        # Level of the app logger, e.g. DEBUG, INFO or WARNING
+        self.LOG_LEVEL = env.get("LOG_LEVEL", "INFO").upper()
+        self.JWT_SECRET_KEY = env.get("JWT_SECRET_KEY")
+        self.JWT_EXPIRY_SECONDS = int(env.get("JWT_EXPIRY_SECONDS", "3600"))
+
+
+# Loads the .env file (without overriding real environment variables) and reads the settings
+def load_config():
+    load_dotenv(dotenv_path=ENV_FILE)
+    return Config()
@@ -0,0 +1,37 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+import os
+import time
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# Threads per worker (gthread), so requests waiting on MySQL do not hold up the rest of the worker.
+# Each thread gets its own app context and database connections.
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Build the app once in the master; workers fork with the code already imported and share
+# it copy-on-write. Database connections are only opened by the workers, after fork.
+preload_app = True
+
+
+# The Flask app, also when serving asgi:app with uvicorn workers
+def _flask_app(app):
+    state = getattr(app, 'state', None)
+    return state.flask_app if state is not None else app
+
+
+# With preload_app the app is built in the master, so its build time is reported here
+def when_ready(server):
+    app = _flask_app(server.app.wsgi())
+    server.log.info("Master ready, app preloaded (built in %.1f ms)", app.config['STARTUP_SECONDS'] * 1000)
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+
+
+# Worker boot time: from fork until the worker is ready to accept requests.
+# Also starts loading the recommendation index in the background, before the first request needs it.
+def post_worker_init(worker):
+    worker.log.info("Worker %s booted in %.1f ms", worker.pid, (time.perf_counter() - worker.forked_at) * 1000)
+    from utils.recommender import job_index
+    job_index.start(_flask_app(worker.wsgi))
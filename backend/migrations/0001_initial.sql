@@ -0,0 +1,36 @@
+-- Base tables as used by the routes. IF NOT EXISTS keeps this a no-op on existing databases.
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(50) NOT NULL DEFAULT 'job_seeker',
+    resume_path VARCHAR(500) NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    company VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    location VARCHAR(255) NOT NULL,
+    posted_by INT NOT NULL,
+    posted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    salary VARCHAR(100) NULL,
+    num_applications INT NOT NULL DEFAULT 0,
+    work_mode VARCHAR(50) NULL,
+    yoe VARCHAR(20) NULL,
+    is_closed BOOLEAN NOT NULL DEFAULT FALSE,
+    skills TEXT NULL,
+    CONSTRAINT fk_jobs_posted_by FOREIGN KEY (posted_by) REFERENCES users (id)
+);
+
+CREATE TABLE IF NOT EXISTS applications (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    job_id INT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_applications_user_job (user_id, job_id),
+    CONSTRAINT fk_applications_user FOREIGN KEY (user_id) REFERENCES users (id),
+    CONSTRAINT fk_applications_job FOREIGN KEY (job_id) REFERENCES jobs (id)
+);
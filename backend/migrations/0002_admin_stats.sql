@@ -0,0 +1,27 @@
+-- Rollup tables behind GET /api/admin/stats, filled by `flask admin rebuild-stats`
+CREATE TABLE IF NOT EXISTS stats_daily_applications (
+    day DATE PRIMARY KEY,
+    applications INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stats_job_applications (
+    job_id INT PRIMARY KEY,
+    applications INT NOT NULL DEFAULT 0,
+    KEY idx_stats_job_applications (applications)
+);
+
+CREATE TABLE IF NOT EXISTS stats_employer_applications (
+    employer_id INT PRIMARY KEY,
+    applications INT NOT NULL DEFAULT 0,
+    KEY idx_stats_employer_applications (applications)
+);
+
+CREATE TABLE IF NOT EXISTS stats_job_status (
+    is_closed BOOLEAN PRIMARY KEY,
+    jobs INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stats_signups (
+    role VARCHAR(50) PRIMARY KEY,
+    users INT NOT NULL DEFAULT 0
+);
@@ -0,0 +1,10 @@
+-- Gazetteer-normalized locations, backfilled by `flask jobs normalize-locations`
+ALTER TABLE jobs ADD COLUMN location_city VARCHAR(100) NULL;
+ALTER TABLE jobs ADD COLUMN location_region VARCHAR(100) NULL;
+ALTER TABLE jobs ADD COLUMN latitude DOUBLE NULL;
+ALTER TABLE jobs ADD COLUMN longitude DOUBLE NULL;
+ALTER TABLE jobs ADD COLUMN geohash CHAR(9) NULL;
+CREATE INDEX idx_jobs_geohash ON jobs (geohash);
+CREATE INDEX idx_jobs_location_city ON jobs (location_city);
+CREATE INDEX idx_jobs_location_region ON jobs (location_region);
+CREATE INDEX idx_jobs_work_mode ON jobs (work_mode);
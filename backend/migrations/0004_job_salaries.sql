@@ -0,0 +1,7 @@
+-- Parsed, annualized salary ranges, backfilled by `flask jobs parse-salaries`
+ALTER TABLE jobs ADD COLUMN salary_min DECIMAL(15, 2) NULL;
+ALTER TABLE jobs ADD COLUMN salary_max DECIMAL(15, 2) NULL;
+ALTER TABLE jobs ADD COLUMN salary_currency CHAR(3) NULL;
+ALTER TABLE jobs ADD COLUMN salary_period VARCHAR(10) NULL;
+CREATE INDEX idx_jobs_open_salary ON jobs (is_closed, salary_max);
+CREATE INDEX idx_jobs_salary ON jobs (salary_max);
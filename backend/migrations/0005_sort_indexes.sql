@@ -0,0 +1,19 @@
+-- Indexes behind the sort= orders of the list endpoints, so ORDER BY ... LIMIT reads them
+-- in index order instead of sorting. InnoDB appends the primary key, which covers the id tie-breaker.
+-- `flask db check-indexes` EXPLAINs the list queries against them.
+
+-- list_jobs and admin list_all_jobs
+CREATE INDEX idx_jobs_posted_at ON jobs (posted_at);
+CREATE INDEX idx_jobs_num_applications ON jobs (num_applications);
+-- search_jobs, filtered by status
+CREATE INDEX idx_jobs_open_posted_at ON jobs (is_closed, posted_at);
+CREATE INDEX idx_jobs_open_num_applications ON jobs (is_closed, num_applications);
+-- list_employer_jobs, with and without a status filter
+CREATE INDEX idx_jobs_employer_posted_at ON jobs (posted_by, posted_at);
+CREATE INDEX idx_jobs_employer_num_applications ON jobs (posted_by, num_applications);
+CREATE INDEX idx_jobs_employer_open_posted_at ON jobs (posted_by, is_closed, posted_at);
+CREATE INDEX idx_jobs_employer_open_num_applications ON jobs (posted_by, is_closed, num_applications);
+-- list_applications, view_job_applications and admin view_all_applications
+CREATE INDEX idx_applications_user_applied_at ON applications (user_id, applied_at);
+CREATE INDEX idx_applications_job_applied_at ON applications (job_id, applied_at);
+CREATE INDEX idx_applications_applied_at ON applications (applied_at);
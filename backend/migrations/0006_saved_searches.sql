@@ -0,0 +1,30 @@
+-- Saved searches and the per-user inbox of postings that matched them.
+-- New or updated postings are matched through idx_saved_searches_skill_yoe, never by reading every search.
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(255) NULL,
+    skill VARCHAR(100) NULL,
+    min_yoe INT NULL,
+    max_yoe INT NULL,
+    work_mode VARCHAR(50) NULL,
+    location_city VARCHAR(100) NULL,
+    min_salary DECIMAL(15, 2) NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_saved_searches_user (user_id),
+    KEY idx_saved_searches_skill_yoe (skill, min_yoe),
+    CONSTRAINT fk_saved_searches_user FOREIGN KEY (user_id) REFERENCES users (id)
+);
+
+CREATE TABLE IF NOT EXISTS saved_search_matches (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    saved_search_id INT NOT NULL,
+    job_id INT NOT NULL,
+    matched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_saved_search_matches (saved_search_id, job_id),
+    KEY idx_saved_search_matches_user (user_id, id),
+    KEY idx_saved_search_matches_job (job_id),
+    CONSTRAINT fk_saved_search_matches_search FOREIGN KEY (saved_search_id)
+        REFERENCES saved_searches (id) ON DELETE CASCADE
+);
@@ -0,0 +1,12 @@
+-- Hot/cold split: closed postings are moved with their applications into the archive tables by
+-- `flask jobs sweep`, so the tables behind list_jobs and search_jobs only hold live postings.
+ALTER TABLE jobs ADD COLUMN closed_at TIMESTAMP NULL;
+-- Postings closed before this migration count as closed now, so they get the full grace period
+UPDATE jobs SET closed_at = CURRENT_TIMESTAMP WHERE is_closed = TRUE AND closed_at IS NULL;
+CREATE INDEX idx_jobs_open_closed_at ON jobs (is_closed, closed_at);
+
+-- Same columns, in the same order, and the same indexes as the hot tables, so rows move with
+-- INSERT ... SELECT * and archived reads use the same sort indexes. Later migrations that change
+-- jobs or applications must change the archive table too. Foreign keys are not copied.
+CREATE TABLE IF NOT EXISTS jobs_archive LIKE jobs;
+CREATE TABLE IF NOT EXISTS applications_archive LIKE applications;
@@ -0,0 +1,6 @@
+-- Read-your-writes deadlines per user, written on the primary after each successful write and
+-- checked by every worker before routing that user's GET requests to a replica
+CREATE TABLE IF NOT EXISTS recent_writes (
+    user_id INT PRIMARY KEY,
+    until TIMESTAMP(3) NOT NULL
+);
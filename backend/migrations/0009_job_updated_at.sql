@@ -0,0 +1,5 @@
+-- Change timestamp read by the recommendation index to catch up on writes made by other
+-- worker processes. The archive table gets the same column to keep the column order identical.
+ALTER TABLE jobs ADD COLUMN updated_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3);
+ALTER TABLE jobs_archive ADD COLUMN updated_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3);
+CREATE INDEX idx_jobs_updated_at ON jobs (updated_at);
@@ -0,0 +1,6 @@
+-- Salary amounts are only compared within one currency, so the salary filters and sort=salary
+-- always come with salary_currency = ?. These indexes serve them in salary_max order.
+CREATE INDEX idx_jobs_currency_salary ON jobs (salary_currency, salary_max);
+CREATE INDEX idx_jobs_open_currency_salary ON jobs (is_closed, salary_currency, salary_max);
+DROP INDEX idx_jobs_salary ON jobs;
+DROP INDEX idx_jobs_open_salary ON jobs;
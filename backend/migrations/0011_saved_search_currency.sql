@@ -0,0 +1,2 @@
+-- Saved salary minimums only match postings in the same currency, as in search
+ALTER TABLE saved_searches ADD COLUMN salary_currency CHAR(3) NULL;
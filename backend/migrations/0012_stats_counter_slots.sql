@@ -0,0 +1,10 @@
+-- The global rollup counters (applications per day, jobs per status, signups per role) are split
+-- into slots. Writers add to a random slot, so concurrent transactions do not all queue on one
+-- row lock until they commit, and reads sum the slots (see models/stats_model.py).
+-- Existing counts stay in slot 0.
+ALTER TABLE stats_daily_applications ADD COLUMN slot TINYINT UNSIGNED NOT NULL DEFAULT 0 AFTER day,
+    DROP PRIMARY KEY, ADD PRIMARY KEY (day, slot);
+ALTER TABLE stats_job_status ADD COLUMN slot TINYINT UNSIGNED NOT NULL DEFAULT 0 AFTER is_closed,
+    DROP PRIMARY KEY, ADD PRIMARY KEY (is_closed, slot);
+ALTER TABLE stats_signups ADD COLUMN slot TINYINT UNSIGNED NOT NULL DEFAULT 0 AFTER role,
+    DROP PRIMARY KEY, ADD PRIMARY KEY (role, slot);
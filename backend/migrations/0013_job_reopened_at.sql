@@ -0,0 +1,5 @@
+-- Set when a closed posting is reopened. `flask jobs sweep` measures a reopened posting's age from
+-- then instead of from posted_at, so it is not closed again on the next sweep. The archive table
+-- gets the same column to keep the column order identical.
+ALTER TABLE jobs ADD COLUMN reopened_at TIMESTAMP NULL;
+ALTER TABLE jobs_archive ADD COLUMN reopened_at TIMESTAMP NULL;
@@ -0,0 +1,117 @@
+# Non-blocking database access for the ASGI handlers in routes/async_routes.py, over aiomysql
+# connection pools. Reads are routed like models/db.py does it: to a replica unless the caller is in
+# their read-your-writes window, with the primary as the fallback.
+import asyncio
+import random
+import time
+
+import aiomysql
+
+from models import db
+
+
+class AsyncRepository:
+    """Runs queries like Repository, but each call takes its own connection from the pool, so
+    independent queries awaited together (asyncio.gather) run concurrently."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetchone(self, sql, params=()):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(sql, tuple(params))
+                return await cur.fetchone()
+
+    async def fetchall(self, sql, params=()):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(sql, tuple(params))
+                return list(await cur.fetchall())
+
+    async def scalar(self, sql, params=()):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(sql, tuple(params))
+                row = await cur.fetchone()
+                return row[0] if row else None
+
+
+class AsyncDatabase:
+    """One pool per database host, created on first use on the server's event loop."""
+
+    def __init__(self, app):
+        self.config = app.config
+        self.logger = app.logger
+        # host[:port] -> task creating its pool
+        self._pools = {}
+
+    def _settings(self, host, replica):
+        config = self.config
+        host, _, port = host.partition(':')
+        settings = dict(
+            host=host,
+            port=int(port or config.get('MYSQL_PORT', 3306)),
+            user=config['MYSQL_USER'],
+            password=config['MYSQL_PASSWORD'],
+            db=config['MYSQL_DB'],
+            charset=config.get('MYSQL_CHARSET', 'utf8'),
+            minsize=1,
+            maxsize=config.get('ASYNC_DB_POOL_SIZE', 10),
+            # Pooled connections outlive requests: autocommit keeps them from reading an old
+            # snapshot, and recycling drops the ones MySQL has timed out
+            autocommit=True,
+            pool_recycle=3600,
+        )
+        if replica:
+            settings['connect_timeout'] = config.get('MYSQL_REPLICA_CONNECT_TIMEOUT', 1)
+        return settings
+
+    async def _pool(self, host, replica=False):
+        if host not in self._pools:
+            self._pools[host] = asyncio.ensure_future(aiomysql.create_pool(**self._settings(host, replica)))
+        try:
+            # Shielded so a cancelled request does not cancel the pool other requests wait for
+            return await asyncio.shield(self._pools[host])
+        except Exception:
+            self._pools.pop(host, None)
+            raise
+
+    async def primary(self):
+        return AsyncRepository(await self._pool(self.config['MYSQL_HOST']))
+
+    async def reads_from_replica(self, request, user_id):
+        if request.method not in db.READ_METHODS or not self.config.get('MYSQL_REPLICA_HOSTS'):
+            return False
+        echoed = db.echoed_write_deadline(request.headers)
+        if echoed is not None:
+            return echoed <= time.time()
+        if user_id is None:
+            return True
+        deadline = db.cached_write_deadline(user_id)
+        if deadline is None:
+            remaining = await (await self.primary()).scalar(db.RECENT_WRITE_QUERY, (user_id,))
+            deadline = db.remember_write_lookup(user_id, remaining, self.config)
+        return deadline <= time.monotonic()
+
+    # Repository for the request's reads, user_id being the JWT identity if the route requires one.
+    # Replicas that fail to connect are skipped for MYSQL_REPLICA_RETRY_SECONDS, as in models/db.py.
+    async def repository(self, request, user_id=None):
+        if await self.reads_from_replica(request, user_id):
+            hosts = db.available_replicas(self.config['MYSQL_REPLICA_HOSTS'])
+            if hosts:
+                replica = random.choice(hosts)
+                try:
+                    return AsyncRepository(await self._pool(replica, replica=True))
+                except (aiomysql.Error, OSError, asyncio.TimeoutError) as e:
+                    db.mark_replica_down(replica, self.config)
+                    self.logger.warning("Replica %s unavailable, reading from primary: %s", replica, e)
+        return await self.primary()
+
+    async def close(self):
+        pools, self._pools = list(self._pools.values()), {}
+        for task in pools:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                pool = task.result()
+                pool.close()
+                await pool.wait_closed()
@@ -0,0 +1,102 @@
+from collections import Counter
+
+from models.db import Repository, union_page
+from models.job_model import ARCHIVE_TABLE
+from models.stats_model import StatsRepository
+
+# Applications of archived jobs, moved along with them (see JobRepository.archive_closed)
+APPLICATIONS_ARCHIVE_TABLE = "applications_archive"
+
+# (applications table, jobs table) pairs read by include_archived
+_TABLES = [("applications", "jobs"), (APPLICATIONS_ARCHIVE_TABLE, ARCHIVE_TABLE)]
+
+
+class ApplicationRepository(Repository):
+    # include_archived also reads the applications of archived jobs
+    @staticmethod
+    def count_for_user_query(user_id, include_archived=False):
+        if include_archived:
+            return (f"SELECT (SELECT COUNT(*) FROM applications WHERE user_id = %s)"
+                    f" + (SELECT COUNT(*) FROM {APPLICATIONS_ARCHIVE_TABLE} WHERE user_id = %s)", [user_id, user_id])
+        return "SELECT COUNT(*) FROM applications WHERE user_id = %s", [user_id]
+
+    @staticmethod
+    def page_for_user_query(user_id, limit, offset, include_archived=False):
+        if include_archived:
+            return union_page([f"""
+                SELECT j.id AS job_id, j.title, j.company, j.description, j.location,
+                       j.posted_at, j.salary, a.applied_at, {archived} AS is_archived
+                FROM {applications} a
+                JOIN {jobs} j ON a.job_id = j.id
+                WHERE a.user_id = %s
+            """ for archived, (applications, jobs) in enumerate(_TABLES)], [user_id], "applied_at DESC", limit, offset)
+        return """
+            SELECT jobs.id AS job_id, jobs.title, jobs.company, jobs.description, jobs.location,
+                   jobs.posted_at, jobs.salary, applications.applied_at
+            FROM applications
+            JOIN jobs ON applications.job_id = jobs.id
+            WHERE applications.user_id = %s
+            ORDER BY applications.applied_at DESC
+            LIMIT %s OFFSET %s
+        """, [user_id, limit, offset]
+
+    def exists(self, user_id, job_id):
+        return self.fetchone("SELECT id FROM applications WHERE user_id = %s AND job_id = %s",
+                             (user_id, job_id)) is not None
+
+    # Inserts the application and bumps the job's counter in one transaction
+    def create(self, user_id, job_id):
+        with self.transaction():
+            application_id = self.execute("INSERT INTO applications (user_id, job_id) VALUES (%s, %s)",
+                                          (user_id, job_id))
+            self.execute("UPDATE jobs SET num_applications = num_applications + 1 WHERE id = %s", (job_id,))
+            StatsRepository(self.connection).applications_added(job_id)
+        return application_id
+
+    # Batched insert of (user_id, job_id) pairs, with one counter update per distinct job
+    def bulk_create(self, pairs):
+        pairs = list(pairs)
+        if not pairs:
+            return 0
+        per_job = Counter(job_id for _, job_id in pairs)
+        with self.transaction():
+            inserted = self.executemany("INSERT INTO applications (user_id, job_id) VALUES (%s, %s)", pairs)
+            self.executemany("UPDATE jobs SET num_applications = num_applications + %s WHERE id = %s",
+                             [(count, job_id) for job_id, count in per_job.items()])
+            stats = StatsRepository(self.connection)
+            for job_id, count in per_job.items():
+                stats.applications_added(job_id, count)
+        return inserted
+
+    def count_for_user(self, user_id, include_archived=False):
+        return self.scalar(*self.count_for_user_query(user_id, include_archived))
+
+    def list_for_user(self, user_id, limit, offset, include_archived=False):
+        return self.fetchall(*self.page_for_user_query(user_id, limit, offset, include_archived))
+
+    def list_job_skills_for_user(self, user_id):
+        return self.fetchall("""
+            SELECT applications.job_id, jobs.skills
+            FROM applications
+            JOIN jobs ON applications.job_id = jobs.id
+            WHERE applications.user_id = %s
+        """, (user_id,))
+
+    # A job's applications are all in one table, so archived jobs read applications_archive
+    def list_for_job(self, job_id, archived=False):
+        return self.fetchall(f"""
+            SELECT users.id AS applicant_id, users.name, users.email, a.applied_at
+            FROM {APPLICATIONS_ARCHIVE_TABLE if archived else "applications"} a
+            JOIN users ON a.user_id = users.id
+            WHERE a.job_id = %s
+            ORDER BY a.applied_at DESC
+        """, (job_id,))
+
+    def list_all(self, include_archived=False):
+        tables = _TABLES if include_archived else _TABLES[:1]
+        return self.fetchall(" UNION ALL ".join(f"""
+            SELECT a.id, u.name, j.title, a.applied_at, {archived} AS is_archived
+            FROM {applications} a
+            JOIN users u ON a.user_id = u.id
+            JOIN {jobs} j ON a.job_id = j.id
+        """ for archived, (applications, jobs) in enumerate(tables)) + " ORDER BY applied_at DESC")
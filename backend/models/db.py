@@ -0,0 +1,279 @@
+# Shared data-access helpers used by the model repositories
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import MySQLdb
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from MySQLdb.cursors import DictCursor
+
+READ_METHODS = ('GET', 'HEAD')
+# MySQL errors meaning a table, column or index already exists
+_ALREADY_EXISTS = {1050, 1060, 1061}
+
+# Read-your-writes deadline (epoch seconds) set on write responses. A client that sends it back
+# on its reads is routed by it alone, without any lookup.
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes-Until'
+
+# Seconds left in the user's read-your-writes window on the primary, no row when it is over
+RECENT_WRITE_QUERY = """
+    SELECT TIMESTAMPDIFF(MICROSECOND, CURRENT_TIMESTAMP(3), until) / 1000000
+    FROM recent_writes WHERE user_id = %s AND until > CURRENT_TIMESTAMP(3)
+"""
+
+# user_id -> monotonic time until which that user's reads go to the primary, from the writes this
+# process served and from lookups of the recent_writes table on the primary, which all workers see.
+# A lookup that found no recent write is trusted for READ_YOUR_WRITES_CHECK_SECONDS (_checked_until),
+# so a reader costs at most one primary query per that interval.
+# Guarded by _recent_writes_lock, since gthread workers serve requests from several threads.
+_recent_writes = {}
+_checked_until = {}
+_recent_writes_lock = threading.Lock()
+
+# replica host -> monotonic time until which it is skipped after a failed connect
+_replicas_down = {}
+
+
+def primary_connection():
+    return current_app.extensions['mysql'].connection
+
+
+def get_connection():
+    if reads_from_replica():
+        replica = get_replica_connection()
+        if replica is not None:
+            return replica
+    return primary_connection()
+
+
+def _current_user_id():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:  # no JWT verified for this request
+        return None
+    return int(identity) if identity is not None else None
+
+
+def reads_from_replica():
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    if not current_app.config.get('MYSQL_REPLICA_HOSTS'):
+        return False
+
+    # Read-your-writes: a user who just wrote keeps reading from the primary for a short window
+    echoed = echoed_write_deadline(request.headers)
+    if echoed is not None:
+        return echoed <= time.time()
+    user_id = _current_user_id()
+    if user_id is None:
+        return True
+    deadline = cached_write_deadline(user_id)
+    if deadline is None:
+        remaining = Repository(primary_connection()).scalar(RECENT_WRITE_QUERY, (user_id,))
+        deadline = remember_write_lookup(user_id, remaining, current_app.config)
+    return deadline <= time.monotonic()
+
+
+# The deadline the client echoed back, None when it sent none
+def echoed_write_deadline(headers):
+    try:
+        return float(headers.get(READ_YOUR_WRITES_HEADER))
+    except (TypeError, ValueError):
+        return None
+
+
+# Monotonic end of the user's read-your-writes window as known in-process, None when the
+# primary has to be asked with RECENT_WRITE_QUERY
+def cached_write_deadline(user_id):
+    now = time.monotonic()
+    with _recent_writes_lock:
+        deadline = _recent_writes.get(user_id, 0)
+        if deadline > now or _checked_until.get(user_id, 0) > now:
+            return deadline
+    return None
+
+
+# Records the answer to RECENT_WRITE_QUERY and returns the window's monotonic end
+def remember_write_lookup(user_id, remaining, config):
+    now = time.monotonic()
+    with _recent_writes_lock:
+        if remaining is not None:
+            _recent_writes[user_id] = now + float(remaining)
+            return _recent_writes[user_id]
+        _checked_until[user_id] = now + config.get('READ_YOUR_WRITES_CHECK_SECONDS', 1)
+        _prune(_checked_until, now)
+        return 0
+
+
+# Drops expired entries so a map stays bounded by the number of recent users; the caller holds the lock
+def _prune(entries, now):
+    if len(entries) > 10000:
+        for key in [key for key, until in entries.items() if until <= now]:
+            entries.pop(key, None)
+
+
+# Replicas not marked down after a failed connect
+def available_replicas(hosts):
+    now = time.monotonic()
+    return [host for host in hosts if _replicas_down.get(host, 0) <= now]
+
+
+def mark_replica_down(host, config):
+    _replicas_down[host] = time.monotonic() + config.get('MYSQL_REPLICA_RETRY_SECONDS', 30)
+
+
+# One replica connection per app context, picked at random among the replicas not marked down,
+# and closed on teardown. Falls back to the primary (returns None) when no replica can be reached;
+# a replica that fails to connect within MYSQL_REPLICA_CONNECT_TIMEOUT is skipped for
+# MYSQL_REPLICA_RETRY_SECONDS, so an unreachable host does not stall every request.
+def get_replica_connection():
+    if '_jobstack_replica' not in g:
+        g._jobstack_replica = None
+        config = current_app.config
+        hosts = available_replicas(config['MYSQL_REPLICA_HOSTS'])
+        if hosts:
+            replica = random.choice(hosts)
+            host, _, port = replica.partition(':')
+            try:
+                # Same connection settings as flask_mysqldb uses for the primary
+                g._jobstack_replica = MySQLdb.connect(
+                    host=host,
+                    port=int(port or config.get('MYSQL_PORT', 3306)),
+                    user=config['MYSQL_USER'],
+                    passwd=config['MYSQL_PASSWORD'],
+                    db=config['MYSQL_DB'],
+                    charset=config.get('MYSQL_CHARSET', 'utf8'),
+                    use_unicode=config.get('MYSQL_USE_UNICODE', True),
+                    connect_timeout=config.get('MYSQL_REPLICA_CONNECT_TIMEOUT', 1),
+                )
+            except MySQLdb.Error as e:
+                mark_replica_down(replica, config)
+                current_app.logger.warning("Replica %s unavailable, reading from primary: %s", replica, e)
+    return g._jobstack_replica
+
+
+def close_replica_connection(exception=None):
+    replica = g.pop('_jobstack_replica', None)
+    if replica is not None:
+        replica.close()
+
+
+# after_request hook: successful writes open the user's read-your-writes window.
+# The deadline is kept on the primary, using its clock, so every worker process honours it.
+def track_writes(response):
+    if request.method in READ_METHODS or request.method == 'OPTIONS' or response.status_code >= 400:
+        return response
+    window = current_app.config.get('READ_YOUR_WRITES_SECONDS', 0)
+    if not window or not current_app.config.get('MYSQL_REPLICA_HOSTS'):
+        return response
+
+    response.headers[READ_YOUR_WRITES_HEADER] = f"{time.time() + window:.3f}"
+    user_id = _current_user_id()
+    if user_id is None:
+        return response
+    with _recent_writes_lock:
+        now = time.monotonic()
+        _recent_writes[user_id] = now + window
+        _checked_until.pop(user_id, None)
+        _prune(_recent_writes, now)
+    repo = Repository(primary_connection())
+    with repo.transaction():
+        repo.execute("""
+            INSERT INTO recent_writes (user_id, until) VALUES (%s, CURRENT_TIMESTAMP(3) + INTERVAL %s SECOND)
+            ON DUPLICATE KEY UPDATE until = VALUES(until)
+        """, (user_id, window))
+    return response
+
+
+# Expands the first "IN %s" into one placeholder per value, so a list is bound as separate params
+def expand_in(sql, count):
+    placeholders = ", ".join(["%s"] * count)
+    return sql.replace("IN %s", f"IN ({placeholders})", 1)
+
+
+# Pages through the union of several SELECTs sharing the same params, e.g. a hot and an archive table.
+# Each branch is limited to limit + offset rows in its own index order, so only those rows are sorted.
+def union_page(selects, params, order, limit, offset):
+    branches = [f"({select} ORDER BY {order} LIMIT %s)" for select in selects]
+    return (" UNION ALL ".join(branches) + f" ORDER BY {order} LIMIT %s OFFSET %s",
+            (list(params) + [limit + offset]) * len(selects) + [limit, offset])
+
+
+class Repository:
+    def __init__(self, connection=None):
+        self.connection = connection if connection is not None else get_connection()
+
+    def fetchone(self, sql, params=()):
+        cur = self.connection.cursor(DictCursor)
+        try:
+            cur.execute(sql, tuple(params))
+            return cur.fetchone()
+        finally:
+            cur.close()
+
+    def fetchall(self, sql, params=()):
+        cur = self.connection.cursor(DictCursor)
+        try:
+            cur.execute(sql, tuple(params))
+            return list(cur.fetchall())
+        finally:
+            cur.close()
+
+    def scalar(self, sql, params=()):
+        cur = self.connection.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            row = cur.fetchone()
+            return row[0] if row else None
+        finally:
+            cur.close()
+
+    # Returns the last inserted id for INSERTs and the affected row count otherwise
+    def execute(self, sql, params=()):
+        cur = self.connection.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            return cur.lastrowid or cur.rowcount
+        finally:
+            cur.close()
+
+    # MySQLdb folds executemany() of a plain INSERT ... VALUES into one multi-row INSERT
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = [tuple(p) for p in seq_of_params]
+        if not seq_of_params:
+            return 0
+        cur = self.connection.cursor()
+        try:
+            cur.executemany(sql, seq_of_params)
+            return cur.rowcount
+        finally:
+            cur.close()
+
+    # Applies DDL statements, skipping the ones whose table, column or index already exists
+    def apply_schema(self, statements):
+        for statement in statements:
+            try:
+                self.execute(statement)
+            except MySQLdb.OperationalError as e:
+                if e.args[0] not in _ALREADY_EXISTS:
+                    raise
+
+    # Commits when the outermost block exits cleanly and rolls back on any error.
+    # The nesting depth lives on the connection so repositories sharing it share the transaction.
+    @contextmanager
+    def transaction(self):
+        conn = self.connection
+        depth = getattr(conn, '_jobstack_tx_depth', 0)
+        conn._jobstack_tx_depth = depth + 1
+        try:
+            yield self
+            if depth == 0:
+                conn.commit()
+        except Exception:
+            if depth == 0:
+                conn.rollback()
+            raise
+        finally:
+            conn._jobstack_tx_depth = depth
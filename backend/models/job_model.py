@@ -0,0 +1,405 @@
+from models.db import Repository, expand_in, union_page
+from models.stats_model import StatsRepository
+from utils.geo import covering_prefixes, normalize_location
+from utils.salary import SALARY_COLUMNS, parse_salary
+
+JOB_COLUMNS = """id, title, company, description, location, posted_by, posted_at, salary,
+                 num_applications, work_mode, yoe, is_closed, skills, location_city, salary_max,
+                 salary_currency"""
+
+# Fields an employer may change on an existing posting
+UPDATABLE_FIELDS = ["title", "description", "location", "work_mode", "yoe", "salary", "company", "skills"]
+
+# Normalized location columns, filled from the gazetteer whenever location is written
+LOCATION_COLUMNS = ["location_city", "location_region", "latitude", "longitude", "geohash"]
+
+# sort= values accepted by the list and search endpoints, each backed by an index (see migrations/)
+SORT_ORDERS = {
+    "newest": "posted_at DESC, id DESC",
+    "applications": "num_applications DESC, id DESC",
+    "salary": "salary_max DESC, id DESC",
+}
+DEFAULT_SORT = "newest"
+# Orders of the employer and admin job lists. They filter by employer/status rather than currency,
+# so there is no index to read salary order from.
+UNFILTERED_SORTS = ("newest", "applications")
+
+# Closed postings are moved here by archive_closed(), see migrations/0007
+ARCHIVE_TABLE = "jobs_archive"
+
+
+# SQL expression for each facet that search results can be counted by.
+# skills is split into one row per skill by facet_query instead.
+FACET_EXPRESSIONS = {
+    "work_mode": "work_mode",
+    "location": "location_city",
+    "yoe": """CASE WHEN yoe REGEXP '^[0-9]+$' THEN
+                 CASE WHEN CAST(yoe AS UNSIGNED) <= 1 THEN '0-1'
+                      WHEN CAST(yoe AS UNSIGNED) <= 4 THEN '2-4'
+                      WHEN CAST(yoe AS UNSIGNED) <= 9 THEN '5-9'
+                      ELSE '10+' END
+               ELSE 'unspecified' END""",
+    "skills": "skill",
+}
+# Only the most common skills are counted, there are too many to list them all
+TOP_SKILLS = 20
+
+# status= values of search; "all" applies no status filter
+STATUSES = ("open", "closed", "all")
+
+
+def join_skills(skills):
+    if isinstance(skills, (list, tuple)):
+        return ",".join(skills) if skills else None
+    return skills
+
+
+def split_skills(skills):
+    return skills.split(",") if skills else []
+
+
+def status_filter(status):
+    if status == 'open':
+        return " AND is_closed = FALSE"
+    if status == 'closed':
+        return " AND is_closed = TRUE"
+    return ""
+
+
+def parse_status(status, default='open'):
+    status = status or default
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+    return status
+
+
+def parse_sort(sort, allowed=tuple(SORT_ORDERS)):
+    sort = sort or DEFAULT_SORT
+    if sort not in allowed:
+        raise ValueError(f"sort must be one of: {', '.join(allowed)}")
+    return sort
+
+
+def order_by(sort):
+    return f" ORDER BY {SORT_ORDERS[sort]}" if sort else ""
+
+
+class JobRepository(Repository):
+    # Query builders return (sql, params) so that callers can execute them however they need
+
+    @classmethod
+    def _where(cls, posted_by=None, status=None, salary=None):
+        where = " WHERE 1=1"
+        params = []
+        if posted_by is not None:
+            where += " AND posted_by = %s"
+            params.append(posted_by)
+        if salary:
+            salary_query, salary_params = cls._salary_where(**salary)
+            where += salary_query
+            params.extend(salary_params)
+        where += status_filter(status)
+        return where, params
+
+    # Salary ranges overlap the requested one: min_salary keeps jobs whose upper bound reaches it,
+    # max_salary keeps jobs whose lower bound is within it. Both use the salary_max/salary_min columns,
+    # within one currency (see utils.salary.salary_filter) through the (salary_currency, salary_max) indexes.
+    @staticmethod
+    def _salary_where(min_salary=None, max_salary=None, currency=None):
+        query = ""
+        params = []
+        if currency:
+            query += " AND salary_currency = %s"
+            params.append(currency.upper())
+        if min_salary is not None:
+            query += " AND salary_max >= %s"
+            params.append(min_salary)
+        if max_salary is not None:
+            query += " AND salary_min <= %s"
+            params.append(max_salary)
+        return query, params
+
+    # include_archived also reads jobs_archive
+    @classmethod
+    def count_query(cls, posted_by=None, status=None, salary=None, include_archived=False):
+        where, params = cls._where(posted_by, status, salary)
+        if include_archived:
+            return (f"SELECT (SELECT COUNT(*) FROM jobs{where}) + (SELECT COUNT(*) FROM {ARCHIVE_TABLE}{where})",
+                    params * 2)
+        return "SELECT COUNT(*) FROM jobs" + where, params
+
+    @classmethod
+    def page_query(cls, limit, offset, posted_by=None, status=None, salary=None, sort=None, include_archived=False):
+        where, params = cls._where(posted_by, status, salary)
+        if include_archived:
+            return union_page([f"SELECT {JOB_COLUMNS}, {archived} AS is_archived FROM {table}{where}"
+                               for archived, table in enumerate(("jobs", ARCHIVE_TABLE))],
+                              params, SORT_ORDERS[sort or DEFAULT_SORT], limit, offset)
+        return (f"SELECT {JOB_COLUMNS} FROM jobs" + where + order_by(sort) + " LIMIT %s OFFSET %s",
+                params + [limit, offset])
+
+    # Location filters come from the gazetteer columns: city/region match exactly and
+    # near=(lat, lon, radius_km) scans the covering geohash prefixes, then checks the distance.
+    # Remote jobs always match.
+    @staticmethod
+    def _location_where(city=None, region=None, near=None):
+        conditions = []
+        params = []
+        if city:
+            conditions.append("location_city = %s")
+            params.append(city)
+        if region:
+            conditions.append("location_region = %s")
+            params.append(region)
+        if near:
+            latitude, longitude, radius_km = near
+            prefixes = covering_prefixes(latitude, longitude, radius_km)
+            conditions.append("(" + " OR ".join(["geohash LIKE %s"] * len(prefixes)) + ")")
+            params.extend(prefix + "%" for prefix in prefixes)
+            conditions.append("ST_Distance_Sphere(POINT(longitude, latitude), POINT(%s, %s)) <= %s")
+            params.extend([longitude, latitude, radius_km * 1000])
+        if not conditions:
+            return "", []
+        return " AND (work_mode = 'remote' OR (" + " AND ".join(conditions) + "))", params
+
+    @classmethod
+    def _search_where(cls, skill=None, min_yoe=None, max_yoe=None, status='open', work_mode=None, location=None,
+                      salary=None):
+        query = " WHERE 1=1"
+        params = []
+
+        # Filter by skill (case-insensitive)
+        if skill:
+            query += " AND LOWER(skills) LIKE %s"
+            params.append(f"%{skill.lower()}%")
+
+        # yoe filters only apply to numeric yoe values
+        if min_yoe is not None:
+            query += " AND yoe REGEXP '^[0-9]+$' AND CAST(yoe AS UNSIGNED) >= %s"
+            params.append(min_yoe)
+        if max_yoe is not None:
+            query += " AND yoe REGEXP '^[0-9]+$' AND CAST(yoe AS UNSIGNED) <= %s"
+            params.append(max_yoe)
+
+        if work_mode:
+            query += " AND work_mode = %s"
+            params.append(work_mode)
+
+        if location:
+            location_query, location_params = cls._location_where(**location)
+            query += location_query
+            params.extend(location_params)
+
+        if salary:
+            salary_query, salary_params = cls._salary_where(**salary)
+            query += salary_query
+            params.extend(salary_params)
+
+        query += status_filter(status)
+        return query, params
+
+    @classmethod
+    def search_query(cls, skill=None, min_yoe=None, max_yoe=None, status='open', work_mode=None, location=None,
+                     salary=None, sort=None):
+        where, params = cls._search_where(skill, min_yoe, max_yoe, status, work_mode, location, salary)
+        return f"SELECT {JOB_COLUMNS} FROM jobs" + where + order_by(sort), params
+
+    # One statement with a separate GROUP BY per requested facet, so each facet returns one row
+    # per distinct value: (facet, facet_value, job_count). Every branch is its own full scan of the
+    # filtered jobs, so n facets cost n scans. The comma-separated skills are split into rows by
+    # position, and only the TOP_SKILLS most common are returned.
+    @classmethod
+    def facet_query(cls, facets, skill=None, min_yoe=None, max_yoe=None, status='open', work_mode=None, location=None,
+                    salary=None):
+        where, params = cls._search_where(skill, min_yoe, max_yoe, status, work_mode, location, salary)
+        branches = []
+        all_params = []
+        for facet in facets:
+            if facet == "skills":
+                # JSON_TABLE only numbers the skills: it reads an array of one 0 per skill, so no
+                # skill text is ever parsed as JSON, and SUBSTRING_INDEX cuts out skill number s.n
+                skill = "TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(skills, ',', s.n), ',', -1))"
+                branches.append(f"""(
+                    SELECT 'skills' AS facet, LOWER({skill}) AS facet_value, COUNT(*) AS job_count
+                    FROM jobs, JSON_TABLE(
+                        CONCAT('[', REPEAT('0,', CHAR_LENGTH(skills) - CHAR_LENGTH(REPLACE(skills, ',', ''))), '0]'),
+                        '$[*]' COLUMNS (n FOR ORDINALITY)) AS s
+                    {where} AND {skill} != ''
+                    GROUP BY facet_value ORDER BY job_count DESC LIMIT {TOP_SKILLS})""")
+                all_params += params
+            else:
+                branches.append(f"(SELECT '{facet}' AS facet, {FACET_EXPRESSIONS[facet]} AS facet_value, COUNT(*) AS job_count"
+                                f" FROM jobs{where} GROUP BY facet_value)")
+                all_params += params
+        return " UNION ALL ".join(branches), all_params
+
+    def count(self, posted_by=None, status=None, salary=None, include_archived=False):
+        return self.scalar(*self.count_query(posted_by, status, salary, include_archived))
+
+    def list_page(self, limit, offset, posted_by=None, status=None, salary=None, sort=None, include_archived=False):
+        return self.fetchall(*self.page_query(limit, offset, posted_by, status, salary, sort, include_archived))
+
+    def search(self, skill=None, min_yoe=None, max_yoe=None, status='open', work_mode=None, location=None,
+               salary=None, sort=None):
+        return self.fetchall(*self.search_query(skill, min_yoe, max_yoe, status, work_mode, location, salary, sort))
+
+    def facets(self, facets, skill=None, min_yoe=None, max_yoe=None, status='open', work_mode=None, location=None,
+               salary=None):
+        return self.fetchall(*self.facet_query(facets, skill, min_yoe, max_yoe, status, work_mode, location, salary))
+
+    # include_archived falls back to jobs_archive, with is_archived set on the row
+    def get(self, job_id, posted_by=None, include_archived=False):
+        query = f"SELECT {JOB_COLUMNS} FROM {{table}} WHERE id = %s"
+        params = [job_id]
+        if posted_by is not None:
+            query += " AND posted_by = %s"
+            params.append(posted_by)
+        job = self.fetchone(query.format(table="jobs"), params)
+        if job is None and include_archived:
+            job = self.fetchone(query.format(table=ARCHIVE_TABLE), params)
+            if job is not None:
+                job["is_archived"] = True
+        return job
+
+    # Batched lookup, returns {job_id: row} for the ids that exist
+    def get_many(self, job_ids):
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return {}
+        rows = self.fetchall(expand_in(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id IN %s", len(job_ids)), job_ids)
+        return {row['id']: row for row in rows}
+
+    def create(self, job, posted_by):
+        with self.transaction():
+            job_id = self.execute(self._INSERT, self._insert_values(job, posted_by))
+            StatsRepository(self.connection).jobs_added(is_closed=False)
+        return job_id
+
+    def bulk_create(self, jobs, posted_by):
+        with self.transaction():
+            inserted = self.executemany(self._INSERT, [self._insert_values(job, posted_by) for job in jobs])
+            StatsRepository(self.connection).jobs_added(is_closed=False, count=inserted)
+        return inserted
+
+    _INSERT = f"""
+        INSERT INTO jobs (title, description, location, work_mode, yoe, salary, company, posted_by, skills,
+                          {", ".join(LOCATION_COLUMNS + SALARY_COLUMNS)})
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, {", ".join(["%s"] * len(LOCATION_COLUMNS + SALARY_COLUMNS))})
+    """
+
+    @staticmethod
+    def _insert_values(job, posted_by):
+        location = normalize_location(job.get("location"))
+        salary = parse_salary(job.get("salary"))
+        return (job.get("title"), job.get("description"), job.get("location"), job.get("work_mode"),
+                job.get("yoe"), job.get("salary"), job.get("company"), posted_by, join_skills(job.get("skills")),
+                *(location[column] for column in LOCATION_COLUMNS),
+                *(salary[column] for column in SALARY_COLUMNS))
+
+    def update(self, job_id, fields):
+        fields = {k: v for k, v in fields.items() if k in UPDATABLE_FIELDS}
+        if not fields:
+            return 0
+        if "skills" in fields:
+            fields["skills"] = join_skills(fields["skills"])
+        if "location" in fields:
+            fields.update(normalize_location(fields["location"]))
+        if "salary" in fields:
+            fields.update(parse_salary(fields["salary"]))
+        assignments = ", ".join(f"{field} = %s" for field in fields)
+        with self.transaction():
+            return self.execute(f"UPDATE jobs SET {assignments} WHERE id = %s", list(fields.values()) + [job_id])
+
+    def set_closed(self, job_id, closed):
+        return self.bulk_set_closed([job_id], closed)
+
+    # Batched status update, one statement for any number of jobs.
+    # Returns how many jobs actually changed status.
+    def bulk_set_closed(self, job_ids, closed):
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return 0
+        # Reopening restarts the posting's age for close_expired()
+        timestamps = "closed_at = CURRENT_TIMESTAMP" if closed else "closed_at = NULL, reopened_at = CURRENT_TIMESTAMP"
+        with self.transaction():
+            changed = self.execute(
+                expand_in(f"UPDATE jobs SET is_closed = %s, {timestamps} WHERE id IN %s AND is_closed != %s",
+                          len(job_ids)),
+                [bool(closed)] + job_ids + [bool(closed)])
+            StatsRepository(self.connection).jobs_status_changed(closed, changed)
+        return changed
+
+    # Closes open jobs posted, or last reopened, more than max_age_days ago, batch_size jobs per
+    # transaction through the (is_closed, posted_at) index. Returns how many jobs were closed.
+    def close_expired(self, max_age_days, batch_size=500):
+        closed = 0
+        while True:
+            with self.transaction():
+                changed = self.execute("""
+                    UPDATE jobs SET is_closed = TRUE, closed_at = CURRENT_TIMESTAMP
+                    WHERE is_closed = FALSE AND posted_at < CURRENT_TIMESTAMP - INTERVAL %s DAY
+                      AND (reopened_at IS NULL OR reopened_at < CURRENT_TIMESTAMP - INTERVAL %s DAY)
+                    ORDER BY posted_at LIMIT %s
+                """, (max_age_days, max_age_days, batch_size))
+                StatsRepository(self.connection).jobs_status_changed(True, changed)
+            closed += changed
+            if changed < batch_size:
+                return closed
+
+    # Moves jobs closed more than after_days ago into jobs_archive, together with their applications,
+    # batch_size jobs per transaction so the hot tables are never locked for long.
+    # Their saved-search matches are dropped. The admin stats do not change: archived jobs stay
+    # closed and their applications stay counted. Returns how many jobs were archived.
+    def archive_closed(self, after_days, batch_size=500):
+        archived = 0
+        while True:
+            with self.transaction():
+                job_ids = [row["id"] for row in self.fetchall("""
+                    SELECT id FROM jobs
+                    WHERE is_closed = TRUE AND closed_at < CURRENT_TIMESTAMP - INTERVAL %s DAY
+                    LIMIT %s FOR UPDATE
+                """, (after_days, batch_size))]
+                if not job_ids:
+                    return archived
+                count = len(job_ids)
+                self.execute(expand_in("INSERT INTO applications_archive SELECT * FROM applications WHERE job_id IN %s",
+                                       count), job_ids)
+                self.execute(expand_in(f"INSERT INTO {ARCHIVE_TABLE} SELECT * FROM jobs WHERE id IN %s", count), job_ids)
+                self.execute(expand_in("DELETE FROM saved_search_matches WHERE job_id IN %s", count), job_ids)
+                self.execute(expand_in("DELETE FROM applications WHERE job_id IN %s", count), job_ids)
+                self.execute(expand_in("DELETE FROM jobs WHERE id IN %s", count), job_ids)
+            archived += count
+            if count < batch_size:
+                return archived
+
+    # Recomputes derived columns of existing rows in id order, batch_size rows per transaction.
+    # Returns the last id processed so an interrupted backfill can resume from it.
+    def _backfill(self, source, columns, derive, batch_size, after_id):
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        while True:
+            rows = self.fetchall(f"SELECT id, {source} FROM jobs WHERE id > %s ORDER BY id LIMIT %s",
+                                 (after_id, batch_size))
+            if not rows:
+                return after_id
+            with self.transaction():
+                self.executemany(f"UPDATE jobs SET {assignments} WHERE id = %s", [
+                    [derive(row[source])[column] for column in columns] + [row["id"]] for row in rows
+                ])
+            after_id = rows[-1]["id"]
+
+    def backfill_locations(self, batch_size=500, after_id=0):
+        return self._backfill("location", LOCATION_COLUMNS, normalize_location, batch_size, after_id)
+
+    def backfill_salaries(self, batch_size=500, after_id=0):
+        return self._backfill("salary", SALARY_COLUMNS, parse_salary, batch_size, after_id)
+
+    # Applications reference jobs through a foreign key, so they go first
+    def delete(self, job_id):
+        with self.transaction():
+            job = self.fetchone("SELECT id, posted_by, is_closed FROM jobs WHERE id = %s FOR UPDATE", (job_id,))
+            if not job:
+                return 0
+            StatsRepository(self.connection).job_deleted(job)
+            self.execute("DELETE FROM saved_search_matches WHERE job_id = %s", (job_id,))
+            self.execute("DELETE FROM applications WHERE job_id = %s", (job_id,))
+            return self.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
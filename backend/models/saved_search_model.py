@@ -0,0 +1,81 @@
+# Saved searches and their match inbox. Instead of users re-running a search, each new or
+# updated posting is matched against the saved searches once, percolator style.
+from models.db import Repository, expand_in
+from models.job_model import split_skills
+
+MAX_SAVED_SEARCHES = 50
+
+SAVED_SEARCH_FIELDS = ["name", "skill", "min_yoe", "max_yoe", "work_mode", "location_city", "min_salary",
+                       "salary_currency"]
+
+
+def normalize_saved_skill(skill):
+    return skill.strip().lower() if skill and skill.strip() else None
+
+
+class SavedSearchRepository(Repository):
+    def create(self, user_id, search):
+        values = [search.get(field) for field in SAVED_SEARCH_FIELDS]
+        with self.transaction():
+            return self.execute(f"""
+                INSERT INTO saved_searches (user_id, {", ".join(SAVED_SEARCH_FIELDS)})
+                VALUES (%s, {", ".join(["%s"] * len(SAVED_SEARCH_FIELDS))})
+            """, [user_id] + values)
+
+    def count_for_user(self, user_id):
+        return self.scalar("SELECT COUNT(*) FROM saved_searches WHERE user_id = %s", (user_id,))
+
+    def list_for_user(self, user_id):
+        return self.fetchall(f"""
+            SELECT id, {", ".join(SAVED_SEARCH_FIELDS)}, created_at
+            FROM saved_searches WHERE user_id = %s ORDER BY id
+        """, (user_id,))
+
+    # Matches go with the search through ON DELETE CASCADE
+    def delete(self, search_id, user_id):
+        with self.transaction():
+            return self.execute("DELETE FROM saved_searches WHERE id = %s AND user_id = %s", (search_id, user_id))
+
+    # Adds the job to the inbox of every saved search it satisfies, in one INSERT ... SELECT.
+    # Every saved search has a skill, so only the searches for one of the job's skills are read,
+    # through the (skill, min_yoe) index; the remaining criteria are checked on those rows.
+    # yoe criteria only match numeric yoe values, as in search_jobs.
+    def match_job(self, job):
+        if job is None or job["is_closed"]:
+            return
+        skills = list(dict.fromkeys(s for s in map(normalize_saved_skill, split_skills(job["skills"])) if s))
+        if not skills:
+            return
+        yoe = int(job["yoe"]) if job["yoe"] is not None and str(job["yoe"]).strip().isdigit() else None
+
+        with self.transaction():
+            self.execute(expand_in("""
+                INSERT IGNORE INTO saved_search_matches (user_id, saved_search_id, job_id)
+                SELECT s.user_id, s.id, %s FROM saved_searches s
+                WHERE s.skill IN %s
+                  AND (s.min_yoe IS NULL OR s.min_yoe <= %s)
+                  AND (s.max_yoe IS NULL OR s.max_yoe >= %s)
+                  AND (s.work_mode IS NULL OR s.work_mode = %s)
+                  AND (s.location_city IS NULL OR s.location_city = %s OR %s = 'remote')
+                  AND (s.min_salary IS NULL OR (s.salary_currency = %s AND s.min_salary <= %s))
+            """, len(skills)), [job["id"]] + skills + [yoe, yoe, job["work_mode"], job["location_city"],
+                                                       job["work_mode"], job["salary_currency"], job["salary_max"]])
+
+    # Without after_id, the newest matches, newest first. With after_id, the matches after it,
+    # oldest first, so a client paging on with the highest id it got sees every match once.
+    def inbox(self, user_id, limit, after_id=None):
+        query = """
+            SELECT m.id, m.saved_search_id, m.matched_at, jobs.id AS job_id, jobs.title, jobs.company,
+                   jobs.location, jobs.work_mode, jobs.yoe, jobs.salary, jobs.posted_at
+            FROM saved_search_matches m
+            JOIN jobs ON jobs.id = m.job_id
+            WHERE m.user_id = %s
+        """
+        params = [user_id]
+        if after_id is not None:
+            query += " AND m.id > %s ORDER BY m.id LIMIT %s"
+            params += [after_id, limit]
+        else:
+            query += " ORDER BY m.id DESC LIMIT %s"
+            params.append(limit)
+        return self.fetchall(query, params)
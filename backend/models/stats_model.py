@@ -0,0 +1,133 @@
+# Rollup tables behind the admin dashboard. Writers update them in the same transaction as
+# the fact they record, so dashboard reads never scan users, jobs or applications.
+import random
+
+from models.db import Repository
+
+# Slots per global counter (daily applications, jobs per status, signups per role). Each write
+# goes to a random slot, so concurrent writers rarely wait on each other's row lock; reads sum them.
+STATS_SLOTS = 16
+
+
+def _slot():
+    return random.randrange(STATS_SLOTS)
+
+
+class StatsRepository(Repository):
+    # Incremental updates, called by the other repositories inside their transactions
+
+    def user_signed_up(self, role, count=1):
+        self.execute("""
+            INSERT INTO stats_signups (role, slot, users) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE users = users + VALUES(users)
+        """, (role, _slot(), count))
+
+    def jobs_added(self, is_closed, count=1):
+        self.execute("""
+            INSERT INTO stats_job_status (is_closed, slot, jobs) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE jobs = jobs + VALUES(jobs)
+        """, (bool(is_closed), _slot(), count))
+
+    # count jobs moved from the other status to is_closed
+    def jobs_status_changed(self, is_closed, count=1):
+        if count:
+            self.jobs_added(is_closed, count)
+            self.jobs_added(not is_closed, -count)
+
+    def applications_added(self, job_id, count=1):
+        self.execute("""
+            INSERT INTO stats_daily_applications (day, slot, applications) VALUES (CURRENT_DATE, %s, %s)
+            ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+        """, (_slot(), count))
+        self.execute("""
+            INSERT INTO stats_job_applications (job_id, applications) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+        """, (job_id, count))
+        self.execute("""
+            INSERT INTO stats_employer_applications (employer_id, applications)
+            SELECT posted_by, %s FROM jobs WHERE id = %s
+            ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+        """, (count, job_id))
+
+    # Must run before the job and its applications are deleted.
+    # Only reads that job's applications, through the job_id index.
+    def job_deleted(self, job):
+        per_day = self.fetchall("""
+            SELECT DATE(applied_at) AS day, COUNT(*) AS applications
+            FROM applications WHERE job_id = %s GROUP BY DATE(applied_at)
+        """, (job["id"],))
+        # Subtracted through a random slot, only the sum of a day's slots is meaningful
+        self.executemany("""
+            INSERT INTO stats_daily_applications (day, slot, applications) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+        """, [(row["day"], _slot(), -row["applications"]) for row in per_day])
+        total = sum(row["applications"] for row in per_day)
+        if total:
+            self.execute("UPDATE stats_employer_applications SET applications = applications - %s WHERE employer_id = %s",
+                         (total, job["posted_by"]))
+        self.execute("DELETE FROM stats_job_applications WHERE job_id = %s", (job["id"],))
+        self.jobs_added(job["is_closed"], -1)
+
+    # Full rebuild from the fact tables, for first setup or after drift.
+    # Archived jobs and applications still count, so both the hot and the archive tables are read.
+    def rebuild(self):
+        applications = """(SELECT a.job_id, a.applied_at, j.posted_by FROM applications a JOIN jobs j ON a.job_id = j.id
+                           UNION ALL
+                           SELECT a.job_id, a.applied_at, j.posted_by FROM applications_archive a
+                           JOIN jobs_archive j ON a.job_id = j.id) AS a"""
+        jobs = "(SELECT is_closed FROM jobs UNION ALL SELECT is_closed FROM jobs_archive) AS j"
+        with self.transaction():
+            for table in ("stats_daily_applications", "stats_job_applications", "stats_employer_applications",
+                          "stats_job_status", "stats_signups"):
+                self.execute(f"DELETE FROM {table}")
+            self.execute(f"""
+                INSERT INTO stats_daily_applications (day, applications)
+                SELECT DATE(applied_at), COUNT(*) FROM {applications} GROUP BY DATE(applied_at)
+            """)
+            self.execute(f"""
+                INSERT INTO stats_job_applications (job_id, applications)
+                SELECT job_id, COUNT(*) FROM {applications} GROUP BY job_id
+            """)
+            self.execute(f"""
+                INSERT INTO stats_employer_applications (employer_id, applications)
+                SELECT posted_by, COUNT(*) FROM {applications} GROUP BY posted_by
+            """)
+            self.execute(f"INSERT INTO stats_job_status (is_closed, jobs) SELECT is_closed, COUNT(*) FROM {jobs} GROUP BY is_closed")
+            self.execute("INSERT INTO stats_signups (role, users) SELECT role, COUNT(*) FROM users GROUP BY role")
+
+    # Dashboard reads, each bounded by its limit
+
+    def signups_by_role(self):
+        rows = self.fetchall("SELECT role, CAST(SUM(users) AS SIGNED) AS users FROM stats_signups GROUP BY role")
+        return {row["role"]: row["users"] for row in rows}
+
+    def jobs_by_status(self):
+        rows = self.fetchall("SELECT is_closed, CAST(SUM(jobs) AS SIGNED) AS jobs FROM stats_job_status GROUP BY is_closed")
+        counts = {"open": 0, "closed": 0}
+        for row in rows:
+            counts["closed" if row["is_closed"] else "open"] = row["jobs"]
+        return counts
+
+    def daily_applications(self, days):
+        return self.fetchall("""
+            SELECT day, CAST(SUM(applications) AS SIGNED) AS applications FROM stats_daily_applications
+            WHERE day > CURRENT_DATE - INTERVAL %s DAY
+            GROUP BY day ORDER BY day
+        """, (days,))
+
+    def top_jobs(self, limit):
+        return self.fetchall("""
+            SELECT s.job_id, COALESCE(jobs.title, jobs_archive.title) AS title, s.applications
+            FROM stats_job_applications s
+            LEFT JOIN jobs ON jobs.id = s.job_id
+            LEFT JOIN jobs_archive ON jobs_archive.id = s.job_id
+            ORDER BY s.applications DESC LIMIT %s
+        """, (limit,))
+
+    def top_employers(self, limit):
+        return self.fetchall("""
+            SELECT s.employer_id, users.name, s.applications
+            FROM stats_employer_applications s
+            LEFT JOIN users ON users.id = s.employer_id
+            ORDER BY s.applications DESC LIMIT %s
+        """, (limit,))
@@ -0,0 +1,35 @@
+from models.db import Repository
+from models.stats_model import StatsRepository
+
+
+class UserRepository(Repository):
+    def create(self, name, email, password_hash, role):
+        with self.transaction():
+            user_id = self.execute(
+                "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, %s)",
+                (name, email, password_hash, role))
+            StatsRepository(self.connection).user_signed_up(role)
+        return user_id
+
+    def get_by_email(self, email):
+        return self.fetchone("SELECT id, name, password, role FROM users WHERE email = %s", (email,))
+
+    def get_profile(self, user_id):
+        return self.fetchone("SELECT id, name, email, role FROM users WHERE id = %s", (user_id,))
+
+    @staticmethod
+    def role_query(user_id):
+        return "SELECT role FROM users WHERE id = %s", [user_id]
+
+    def get_role(self, user_id):
+        return self.scalar(*self.role_query(user_id))
+
+    def list_all(self):
+        return self.fetchall("SELECT id, name, email, role FROM users")
+
+    def get_resume_path(self, user_id):
+        return self.scalar("SELECT resume_path FROM users WHERE id = %s", (user_id,))
+
+    def set_resume_path(self, user_id, path):
+        with self.transaction():
+            self.execute("UPDATE users SET resume_path = %s WHERE id = %s", (path, user_id))
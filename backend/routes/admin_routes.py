@@ -1,15 +1,15 @@
-from flask import Blueprint, jsonify, current_app, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from models.user_model import UserRepository
+from models.job_model import JobRepository, UNFILTERED_SORTS, parse_sort, split_skills
+from models.application_model import ApplicationRepository
+from models.stats_model import StatsRepository
+from utils.job_events import job_saved, job_deleted
 
 admin_bp = Blueprint('admin', __name__)
 
 def is_admin(user_id):
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT role FROM users WHERE id = %s", (user_id,))
-    role = cur.fetchone()
-    cur.close()
-    return role and role[0] == 'admin'
+    return UserRepository().get_role(user_id) == 'admin'
 
 ### /users- to view all users
 @admin_bp.route('/users', methods=['GET'])
@@ -19,16 +19,41 @@ def list_users():
     if not is_admin(user_id):
         return jsonify({"error": "Unauthorized"}), 403
 
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT id, name, email, role FROM users")
-    users = cur.fetchall()
-    cur.close()
+    users = UserRepository().list_all()
 
     return jsonify({"users": [
-        {"id": u[0], "name": u[1], "email": u[2], "role": u[3]} for u in users
+        {"id": u["id"], "name": u["name"], "email": u["email"], "role": u["role"]} for u in users
     ]}), 200
 
+# Response body of /jobs, shared with the ASGI handler in routes/async_routes.py
+def all_jobs_page(total, page, per_page, jobs):
+    job_list = []
+    for job in jobs:
+        job_list.append({
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "location": job["location"],
+            "posted_by": job["posted_by"],
+            "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None,
+            "salary": job["salary"],
+            "num_applications": job["num_applications"],
+            "work_mode": job["work_mode"],
+            "yoe": job["yoe"],
+            "is_closed": bool(job["is_closed"]),
+            "is_archived": bool(job.get("is_archived")),
+            "skills": split_skills(job["skills"])
+        })
+
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page,
+        "jobs": job_list
+    }
+
 ### /jobs- to view all jobs
 @admin_bp.route('/jobs', methods=['GET'])
 @jwt_required()
@@ -41,49 +66,20 @@ def list_all_jobs():
         page = request.args.get('page', default=1, type=int)
         per_page = request.args.get('per_page', default=10, type=int)
         offset = (page - 1) * per_page
+        # include_archived=true also lists archived jobs
+        include_archived = request.args.get('include_archived', default='false').lower() == 'true'
+        # sort=newest (default) or applications
+        try:
+            sort = parse_sort(request.args.get('sort', type=str), UNFILTERED_SORTS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Get total count of jobs for pagination and the page of jobs
+        jobs_repo = JobRepository()
+        total = jobs_repo.count(include_archived=include_archived)
+        jobs = jobs_repo.list_page(per_page, offset, sort=sort, include_archived=include_archived)
 
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-
-        # Get total count of jobs for pagination
-        cur.execute("SELECT COUNT(*) FROM jobs")
-        total = cur.fetchone()[0]
-
-        # Fetch jobs with pagination
-        cur.execute("""
-            SELECT id, title, company, description, location, posted_by, posted_at, salary,
-                   num_applications, work_mode, yoe, is_closed, skills
-            FROM jobs
-            LIMIT %s OFFSET %s
-        """, (per_page, offset))
-        jobs = cur.fetchall()
-        cur.close()
-
-        job_list = []
-        for job in jobs:
-            job_list.append({
-                "id": job[0],
-                "title": job[1],
-                "company": job[2],
-                "description": job[3],
-                "location": job[4],
-                "posted_by": job[5],
-                "posted_at": job[6].isoformat() if job[6] else None,
-                "salary": job[7],
-                "num_applications": job[8],
-                "work_mode": job[9],
-                "yoe": job[10],
-                "is_closed": bool(job[11]),
-                "skills": job[12].split(",") if job[12] else []
-            })
-
-        return jsonify({
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
-            "jobs": job_list
-        }), 200
+        return jsonify(all_jobs_page(total, page, per_page, jobs)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -97,28 +93,55 @@ def view_all_applications():
     if not is_admin(user_id):
         return jsonify({"error": "Unauthorized"}), 403
 
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
-    query = """
-        SELECT a.id, u.name, j.title, a.applied_at
-        FROM applications a
-        JOIN users u ON a.user_id = u.id
-        JOIN jobs j ON a.job_id = j.id
-        ORDER BY a.applied_at DESC
-    """
-    cur.execute(query)
-    results = cur.fetchall()
-    cur.close()
+    # include_archived=true also lists applications to archived jobs
+    include_archived = request.args.get('include_archived', default='false').lower() == 'true'
+    results = ApplicationRepository().list_all(include_archived)
 
     return jsonify({"applications": [
         {
-            "application_id": row[0],
-            "applicant_name": row[1],
-            "job_title": row[2],
-            "applied_at": row[3].isoformat() if row[3] else None
+            "application_id": row["id"],
+            "applicant_name": row["name"],
+            "job_title": row["title"],
+            "applied_at": row["applied_at"].isoformat() if row["applied_at"] else None,
+            "is_archived": bool(row["is_archived"])
         } for row in results
     ]}), 200
 
+### /stats- dashboard counts, read from the rollup tables only
+@admin_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def stats():
+    user_id = int(get_jwt_identity())
+    if not is_admin(user_id):
+        return jsonify({"error": "Unauthorized"}), 403
+
+    days = max(1, min(request.args.get('days', default=30, type=int), 366))
+    limit = max(1, min(request.args.get('limit', default=10, type=int), 100))
+    stats_repo = StatsRepository()
+
+    return jsonify({
+        "signups_by_role": stats_repo.signups_by_role(),
+        "jobs": stats_repo.jobs_by_status(),
+        "applications_per_day": [
+            {"day": row["day"].isoformat(), "applications": row["applications"]}
+            for row in stats_repo.daily_applications(days)
+        ],
+        "top_jobs": [
+            {"job_id": row["job_id"], "title": row["title"], "applications": row["applications"]}
+            for row in stats_repo.top_jobs(limit)
+        ],
+        "top_employers": [
+            {"employer_id": row["employer_id"], "name": row["name"], "applications": row["applications"]}
+            for row in stats_repo.top_employers(limit)
+        ]
+    }), 200
+
+### `flask admin rebuild-stats`- recomputes the rollup tables from the fact tables
+@admin_bp.cli.command('rebuild-stats')
+def rebuild_stats():
+    StatsRepository().rebuild()
+    print("Admin stats rebuilt")
+
 ### /jobs/job-id/close- to close a job
 @admin_bp.route('/jobs/<int:job_id>/close', methods=['POST'])
 @jwt_required()
@@ -127,23 +150,19 @@ def close_job(job_id):
     if not is_admin(user_id):
         return jsonify({"error": "Unauthorized"}), 403
 
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
+    jobs_repo = JobRepository()
 
     # Check if the job exists and fetch is_closed status
-    cur.execute("SELECT is_closed FROM jobs WHERE id = %s", (job_id,))
-    result = cur.fetchone()
-    if not result:
+    job = jobs_repo.get(job_id)
+    if not job:
         return jsonify({"error": "Job not found"}), 404
     # Check if the job is already closed
-    is_closed = result[0]
-    if is_closed:
+    if job["is_closed"]:
         return jsonify({"message": "Job is already closed"}), 400 
     
     # Update the job status to closed
-    cur.execute("UPDATE jobs SET is_closed = TRUE WHERE id = %s", (job_id,))
-    mysql.connection.commit()
-    cur.close()
+    jobs_repo.set_closed(job_id, True)
+    job_saved(jobs_repo.get(job_id))
 
     return jsonify({"message": f"Job {job_id} marked as closed"}), 200
 
@@ -155,23 +174,19 @@ def reopen_job(job_id):
     if not is_admin(user_id):
         return jsonify({"error": "Unauthorized"}), 403
 
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
+    jobs_repo = JobRepository()
 
     # Check if job exists and current is_closed status
-    cur.execute("SELECT is_closed FROM jobs WHERE id = %s", (job_id,))
-    result = cur.fetchone()
-    if not result:
+    job = jobs_repo.get(job_id)
+    if not job:
         return jsonify({"error": "Job not found"}), 404
 
-    is_closed = result[0]
-    if not is_closed:
+    if not job["is_closed"]:
         return jsonify({"message": "Job is already open"}), 400
 
     # Reopen the job
-    cur.execute("UPDATE jobs SET is_closed = FALSE WHERE id = %s", (job_id,))
-    mysql.connection.commit()
-    cur.close()
+    jobs_repo.set_closed(job_id, False)
+    job_saved(jobs_repo.get(job_id))
 
     return jsonify({"message": "Job reopened successfully"}), 200
 
@@ -184,21 +199,15 @@ def delete_job_by_admin(job_id):
         if claims.get("role") != "admin":
             return jsonify({"error": "Only admins can delete jobs"}), 403
 
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
+        jobs_repo = JobRepository()
 
         # Check if job exists
-        cur.execute("SELECT id FROM jobs WHERE id = %s", (job_id,))
-        job = cur.fetchone()
-        if not job:
+        if not jobs_repo.get(job_id):
             return jsonify({"error": "Job not found"}), 404
 
-        # Delete related applications first
-        cur.execute("DELETE FROM applications WHERE job_id = %s", (job_id,))
-        # Delete the job
-        cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
-        mysql.connection.commit()
-        cur.close()
+        # Delete the job along with its applications
+        jobs_repo.delete(job_id)
+        job_deleted(job_id)
 
         return jsonify({"message": "Job deleted by admin successfully"}), 200
 
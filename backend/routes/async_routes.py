@@ -0,0 +1,212 @@
+# ASGI handlers for the list and search endpoints, served by asgi.py in front of the Flask app.
+# They run as coroutines over the aiomysql pools in models/aio.py, so a request waiting on MySQL
+# holds no thread, and the COUNT and page queries of a list run concurrently. URLs, query strings,
+# JWT auth and response bodies are those of the Flask views they shadow; every other route is
+# served by the Flask app, on a thread pool.
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+
+import jwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+
+from models.aio import AsyncDatabase
+from models.application_model import ApplicationRepository
+from models.db import READ_YOUR_WRITES_HEADER
+from models.job_model import JobRepository, UNFILTERED_SORTS, parse_sort
+from models.user_model import UserRepository
+from routes.admin_routes import all_jobs_page
+from routes.employer_routes import employer_jobs_page
+from routes.job_routes import is_unfiltered, parse_search, search_response
+from routes.jobseeker_routes import applications_page, jobs_page
+from utils import facets as facet_counts
+from utils.salary import salary_filter
+
+
+# Same checks and error bodies as flask_jwt_extended's jwt_required() for a token in the
+# Authorization header; the claims are left on request.state.jwt
+def jwt_required(handler):
+    @functools.wraps(handler)
+    async def wrapper(request):
+        config = request.app.state.config
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme != 'Bearer' or not token:
+            return JSONResponse({"msg": "Missing Authorization Header"}, 401)
+        try:
+            claims = jwt.decode(token, config['JWT_SECRET_KEY'], algorithms=[config.get('JWT_ALGORITHM', 'HS256')])
+        except jwt.ExpiredSignatureError:
+            return JSONResponse({"msg": "Token has expired"}, 401)
+        except jwt.InvalidTokenError as e:
+            return JSONResponse({"msg": str(e)}, 422)
+        if claims.get('type') != 'access':
+            return JSONResponse({"msg": "Only non-refresh tokens are allowed"}, 422)
+        request.state.jwt = claims
+        return await handler(request)
+    return wrapper
+
+
+# Query string with werkzeug's get(name, default, type), so the Flask views' parsers apply as-is
+def query_args(request):
+    return MultiDict(request.query_params.multi_items())
+
+
+def page_args(args):
+    page = args.get('page', default=1, type=int)
+    per_page = args.get('per_page', default=10, type=int)
+    return page, per_page, (page - 1) * per_page
+
+
+def include_archived(args):
+    return args.get('include_archived', default='false').lower() == 'true'
+
+
+### /api/jobs
+async def list_jobs(request):
+    try:
+        args = query_args(request)
+        page, per_page, offset = page_args(args)
+        try:
+            sort = parse_sort(args.get('sort', type=str))
+            salary = salary_filter(args, sort)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+
+        repo = await request.app.state.database.repository(request)
+        total, jobs = await asyncio.gather(
+            repo.scalar(*JobRepository.count_query(salary=salary)),
+            repo.fetchall(*JobRepository.page_query(per_page, offset, salary=salary, sort=sort)))
+        return JSONResponse(jobs_page(total, page, per_page, jobs))
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+### /api/jobs/search
+async def search_jobs(request):
+    flask_app = request.app.state.flask_app
+    try:
+        # The gazetteer behind city names is configured on the Flask app
+        with flask_app.app_context():
+            filters, sort, facets = parse_search(query_args(request))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+
+    unfiltered = is_unfiltered(filters)
+    counts = facet_counts.get_cached(filters["status"], facets) if facets and unfiltered else None
+
+    repo = await request.app.state.database.repository(request)
+    queries = [repo.fetchall(*JobRepository.search_query(**filters, sort=sort))]
+    if facets and counts is None:
+        queries.append(repo.fetchall(*JobRepository.facet_query(facets, **filters)))
+    jobs, *facet_rows = await asyncio.gather(*queries)
+    if facet_rows:
+        counts = facet_counts.fold_facets(facet_rows[0], facets)
+        if unfiltered:
+            facet_counts.set_cached(filters["status"], facets, counts, flask_app.config.get('FACET_CACHE_SECONDS', 60))
+
+    return JSONResponse(search_response(jobs, facets, counts))
+
+
+### /api/applications
+@jwt_required
+async def list_applications(request):
+    try:
+        user_id = int(request.state.jwt['sub'])
+        args = query_args(request)
+        page, per_page, offset = page_args(args)
+        archived = include_archived(args)
+
+        repo = await request.app.state.database.repository(request, user_id)
+        total, applications = await asyncio.gather(
+            repo.scalar(*ApplicationRepository.count_for_user_query(user_id, archived)),
+            repo.fetchall(*ApplicationRepository.page_for_user_query(user_id, per_page, offset, archived)))
+        return JSONResponse(applications_page(total, page, per_page, applications))
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+### /api/employer/jobs
+@jwt_required
+async def list_employer_jobs(request):
+    try:
+        user_id = int(request.state.jwt['sub'])
+        args = query_args(request)
+        page, per_page, offset = page_args(args)
+        status = args.get('status', default=None, type=str)
+        archived = include_archived(args)
+        try:
+            sort = parse_sort(args.get('sort', type=str), UNFILTERED_SORTS)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+
+        repo = await request.app.state.database.repository(request, user_id)
+        total, jobs = await asyncio.gather(
+            repo.scalar(*JobRepository.count_query(posted_by=user_id, status=status, include_archived=archived)),
+            repo.fetchall(*JobRepository.page_query(per_page, offset, posted_by=user_id, status=status, sort=sort,
+                                                    include_archived=archived)))
+        return JSONResponse(employer_jobs_page(total, page, per_page, jobs))
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+### /api/admin/jobs
+@jwt_required
+async def list_all_jobs(request):
+    try:
+        user_id = int(request.state.jwt['sub'])
+        args = query_args(request)
+        page, per_page, offset = page_args(args)
+        archived = include_archived(args)
+        try:
+            sort = parse_sort(args.get('sort', type=str), UNFILTERED_SORTS)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+
+        repo = await request.app.state.database.repository(request, user_id)
+        if await repo.scalar(*UserRepository.role_query(user_id)) != 'admin':
+            return JSONResponse({"error": "Unauthorized"}, 403)
+        total, jobs = await asyncio.gather(
+            repo.scalar(*JobRepository.count_query(include_archived=archived)),
+            repo.fetchall(*JobRepository.page_query(per_page, offset, sort=sort, include_archived=archived)))
+        return JSONResponse(all_jobs_page(total, page, per_page, jobs))
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+ASYNC_ROUTES = [
+    ("/api/jobs", list_jobs),
+    ("/api/jobs/search", search_jobs),
+    ("/api/applications", list_applications),
+    ("/api/employer/jobs", list_employer_jobs),
+    ("/api/admin/jobs", list_all_jobs),
+]
+
+
+# The ASGI app: the routes above, then the Flask app for everything else. CORS preflights for the
+# async routes fall through to Flask, which also serves OPTIONS on those URLs.
+def create_asgi_app(flask_app):
+    database = AsyncDatabase(flask_app)
+    cors = [Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+                       expose_headers=[READ_YOUR_WRITES_HEADER])]
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await database.close()
+
+    routes = [Route(path, handler, methods=["GET"], middleware=cors) for path, handler in ASYNC_ROUTES]
+    routes.append(Mount("/", app=WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_WSGI_THREADS', 10))))
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.flask_app = flask_app
+    app.state.config = flask_app.config
+    app.state.database = database
+    return app
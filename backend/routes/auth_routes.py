@@ -2,18 +2,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
-from config import Config
+from models.user_model import UserRepository
 import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
-#Acces MySQL connection from the app context instead of importing it directly to avoid circular imports
-def get_mysql():
-    return current_app.extensions('mysql')
-    if not mysql:
-            raise RuntimeError("MySQL not initialized")
-    return mysql
-
 # Register a new user
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -31,14 +24,8 @@ def register():
     hashed_password = generate_password_hash(password)
 
     try:
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-
         # Insert new user into the database
-        cur.execute("INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, %s)",
-                    (name, email, hashed_password, role))
-        mysql.connection.commit()
-        cur.close()
+        UserRepository().create(name, email, hashed_password, role)
 
         # Returns 201 Created on success
         return jsonify({"message": "User registered successfully"}), 201
@@ -60,24 +47,19 @@ def login():
         return jsonify({"error": "Email and password required"}), 400
 
     try:
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-        # Fetch user by email from the database
-        cur.execute("SELECT id, name, password, role FROM users WHERE email = %s", (email,))
-        # Fetch one user record from the cursor if it exists and return it as a tuple
-        user = cur.fetchone()
-        cur.close()
+        # Fetch user by email from the database, None if it does not exist
+        user = UserRepository().get_by_email(email)
 
         # If user exists, verify the password
         if user:
-            user_id, name, hashed_pw, role = user
+            user_id, name, hashed_pw, role = user["id"], user["name"], user["password"], user["role"]
             # Check if the provided password matches the hashed password using werkzeug's security module- check_password_hash() 
             if check_password_hash(hashed_pw, password):
                 # Create JWT token with user identity if password is correct
                 access_token = create_access_token(
                     identity=str(user_id),
                     additional_claims={"name": name, "role": role},
-                    expires_delta=datetime.timedelta(seconds=Config.JWT_EXPIRY_SECONDS)
+                    expires_delta=datetime.timedelta(seconds=current_app.config['JWT_EXPIRY_SECONDS'])
                 )
                 return jsonify({"token": access_token}), 200
             else:
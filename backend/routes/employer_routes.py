@@ -1,5 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from models.job_model import JobRepository, UNFILTERED_SORTS, UPDATABLE_FIELDS, parse_sort, split_skills
+from models.application_model import ApplicationRepository
+from utils.job_events import job_saved, job_deleted
 
 employer_bp = Blueprint('employer', __name__)
 
@@ -7,9 +10,6 @@ employer_bp = Blueprint('employer', __name__)
 @employer_bp.route("/jobs/create", methods=["POST"])
 @jwt_required()
 def create_job():
-    db = current_app.extensions["mysql"].connection
-    cursor = db.cursor()
-
     # Check if the user is an employer
     claims = get_jwt()
     user = get_jwt_identity()
@@ -26,22 +26,45 @@ def create_job():
     yoe = data.get("yoe")
     salary = data.get("salary")
     company = data.get("company")
-    skills_list = data.get("skills")  # get the list from JSON
-    skills_str = ",".join(skills_list) if skills_list else None  # join it to a string for DB
 
     # Validate required fields
     if not all([title, description, location, work_mode, yoe, salary, company]):
         return jsonify({"error": "All fields are required"}), 400
 
-    # Insert job into the database
-    cursor.execute("""
-        INSERT INTO jobs (title, description, location, work_mode, yoe, salary, company, posted_by, skills)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """, (title, description, location, work_mode, yoe, salary, company, user, skills_str))
-
-    db.commit()
+    # Insert job into the database, the skills list is stored as a comma-separated string
+    jobs_repo = JobRepository()
+    job_id = jobs_repo.create(data, posted_by=user)
+    job_saved(jobs_repo.get(job_id))
     return jsonify({"message": "Job created successfully"}), 201
 
+# Response body of /api/employer/jobs, shared with the ASGI handler in routes/async_routes.py
+def employer_jobs_page(total, page, per_page, jobs):
+    jobs_list = []
+    for job in jobs:
+        jobs_list.append({
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "location": job["location"],
+            "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None,
+            "salary": job["salary"],
+            "num_applications": job["num_applications"],
+            "work_mode": job["work_mode"],
+            "yoe": job["yoe"],
+            "skills": split_skills(job["skills"]),
+            "is_closed": bool(job["is_closed"]),
+            "is_archived": bool(job.get("is_archived"))
+        })
+
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page,
+        "jobs": jobs_list
+    }
+
 ### /api/employer/jobs - List all jobs posted by the employer
 @employer_bp.route('/jobs', methods=['GET'])
 @jwt_required()
@@ -52,68 +75,21 @@ def list_employer_jobs():
         per_page = request.args.get('per_page', default=10, type=int)
         offset = (page - 1) * per_page
         status = request.args.get('status', default=None, type=str)
-
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-
-        # Base count query to get total jobs for pagination
-        count_query = "SELECT COUNT(*) FROM jobs WHERE posted_by = %s"
-        params = [user_id]
-
-        # Add status filter to count query
-        if status == 'open':
-            count_query += " AND is_closed = FALSE"
-        elif status == 'closed':
-            count_query += " AND is_closed = TRUE"
-
-        cur.execute(count_query, tuple(params))
-        total = cur.fetchone()[0]
-
-        # Base select query with filters
-        query = """
-            SELECT id, title, company, description, location, posted_at, salary, num_applications, 
-                   work_mode, yoe, skills, is_closed
-            FROM jobs
-            WHERE posted_by = %s
-        """
-
-        # Add status filter to select query
-        if status == 'open':
-            query += " AND is_closed = FALSE"
-        elif status == 'closed':
-            query += " AND is_closed = TRUE"
-
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-
-        cur.execute(query, tuple(params))
-        jobs = cur.fetchall()
-        cur.close()
-
-        jobs_list = []
-        for job in jobs:
-            jobs_list.append({
-                "id": job[0],
-                "title": job[1],
-                "company": job[2],
-                "description": job[3],
-                "location": job[4],
-                "posted_at": job[5].isoformat() if job[5] else None,
-                "salary": job[6],
-                "num_applications": job[7],
-                "work_mode": job[8],
-                "yoe": job[9],
-                "skills": job[10].split(",") if job[10] else [],
-                "is_closed": bool(job[11])
-            })
-
-        return jsonify({
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
-            "jobs": jobs_list
-        }), 200
+        # include_archived=true also lists postings moved to the archive by `flask jobs sweep`
+        include_archived = request.args.get('include_archived', default='false').lower() == 'true'
+        # sort=newest (default) or applications
+        try:
+            sort = parse_sort(request.args.get('sort', type=str), UNFILTERED_SORTS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Total jobs for pagination and the current page, both with the optional status filter
+        jobs_repo = JobRepository()
+        total = jobs_repo.count(posted_by=user_id, status=status, include_archived=include_archived)
+        jobs = jobs_repo.list_page(per_page, offset, posted_by=user_id, status=status, sort=sort,
+                                   include_archived=include_archived)
+
+        return jsonify(employer_jobs_page(total, page, per_page, jobs)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -124,34 +100,23 @@ def list_employer_jobs():
 def view_job_applications(job_id):
     try:
         user_id = int(get_jwt_identity())
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
 
-        # Check if job belongs to employer
-        cur.execute("SELECT id FROM jobs WHERE id = %s AND posted_by = %s", (job_id, user_id))
-        job = cur.fetchone()
+        # Check if job belongs to employer, archived jobs included
+        job = JobRepository().get(job_id, posted_by=user_id, include_archived=True)
         if not job:
             return jsonify({"error": "Job not found or unauthorized"}), 404
 
-        # Get all applications for the job, join with users to get applicant details
-        cur.execute("""
-            SELECT users.id, users.name, users.email, applications.applied_at
-            FROM applications
-            JOIN users ON applications.user_id = users.id
-            WHERE applications.job_id = %s
-            ORDER BY applications.applied_at DESC
-        """, (job_id,))
-        applications = cur.fetchall()
-        cur.close()
+        # Get all applications for the job, joined with users to get applicant details
+        applications = ApplicationRepository().list_for_job(job_id, archived=job.get("is_archived", False))
 
         # Format applications into a list of dictionaries
         apps_list = []
         for app in applications:
             apps_list.append({
-                "applicant_id": app[0],
-                "applicant_name": app[1],
-                "applicant_email": app[2],
-                "applied_at": app[3].isoformat() if app[3] else None
+                "applicant_id": app["applicant_id"],
+                "applicant_name": app["name"],
+                "applicant_email": app["email"],
+                "applied_at": app["applied_at"].isoformat() if app["applied_at"] else None
             })
 
         return jsonify({"applications": apps_list}), 200
@@ -163,45 +128,28 @@ def view_job_applications(job_id):
 @employer_bp.route("/jobs/<int:job_id>", methods=["PATCH"])
 @jwt_required()
 def update_job(job_id):
-    mysql = current_app.extensions['mysql']
-    cursor = mysql.connection.cursor()
-
+    jobs_repo = JobRepository()
     user_id = int(get_jwt_identity())
 
     # First verify if the user is an employer and owns this job
-    cursor.execute("SELECT posted_by FROM jobs WHERE id = %s", (job_id,))
-    job = cursor.fetchone()
+    job = jobs_repo.get(job_id)
     if not job:
         return jsonify({"error": "Job not found"}), 404
 
-    if job[0] != user_id:
+    if job["posted_by"] != user_id:
         return jsonify({"error": "Unauthorized to update this job"}), 403
 
     data = request.get_json()
     if not data:
         return jsonify({"error": "No update data provided"}), 400
 
-    # Allowed fields to update
-    allowed_fields = ["title", "description", "location", "work_mode", "yoe", "salary", "company", "skills"]
-    update_fields = []
-    update_values = []
-
-    # Check which fields are provided in the request and prepare the update query
-    for field in allowed_fields:
-        if field in data:
-            update_fields.append(f"{field} = %s")
-            update_values.append(data[field])
-
+    # Only the allowed fields provided in the request are updated
+    update_fields = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
     if not update_fields:
         return jsonify({"error": "No valid fields to update"}), 400
 
-    update_values.append(job_id)
-
-    # Construct the update query dynamically
-    update_query = f"UPDATE jobs SET {', '.join(update_fields)} WHERE id = %s"
-    cursor.execute(update_query, tuple(update_values))
-    mysql.connection.commit()
-    cursor.close()
+    jobs_repo.update(job_id, update_fields)
+    job_saved(jobs_repo.get(job_id))
 
     return jsonify({"message": "Job updated successfully"}), 200
 
@@ -211,21 +159,15 @@ def update_job(job_id):
 def delete_job(job_id):
     try:
         user_id = int(get_jwt_identity())
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
+        jobs_repo = JobRepository()
 
         # Check ownership
-        cur.execute("SELECT id FROM jobs WHERE id = %s AND posted_by = %s", (job_id, user_id))
-        job = cur.fetchone()
-        if not job:
+        if not jobs_repo.get(job_id, posted_by=user_id):
             return jsonify({"error": "Job not found or unauthorized"}), 404
 
-        # Delete applications related to this job first (foreign key)
-        cur.execute("DELETE FROM applications WHERE job_id = %s", (job_id,))
-        # Then delete the job itself
-        cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
-        mysql.connection.commit()
-        cur.close()
+        # Delete the job along with its applications (foreign key)
+        jobs_repo.delete(job_id)
+        job_deleted(job_id)
 
         return jsonify({"message": "Job deleted successfully"}), 200
 
@@ -238,22 +180,19 @@ def delete_job(job_id):
 def close_job(job_id):
     try:
         user_id = int(get_jwt_identity())
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
+        jobs_repo = JobRepository()
 
         # Verify ownership
-        cur.execute("SELECT id, is_closed FROM jobs WHERE id = %s AND posted_by = %s", (job_id, user_id))
-        job = cur.fetchone()
+        job = jobs_repo.get(job_id, posted_by=user_id)
         if not job:
             return jsonify({"error": "Job not found or unauthorized"}), 404
 
-        if job[1]:  # already closed
+        if job["is_closed"]:  # already closed
             return jsonify({"message": "Job is already closed"}), 400
         
         # Update job to mark it as closed
-        cur.execute("UPDATE jobs SET is_closed = TRUE WHERE id = %s", (job_id,))
-        mysql.connection.commit()
-        cur.close()
+        jobs_repo.set_closed(job_id, True)
+        job_saved(jobs_repo.get(job_id))
 
         return jsonify({"message": "Job closed successfully"}), 200
 
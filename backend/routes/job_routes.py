@@ -1,66 +1,141 @@
+import time
+import click
 from flask import Blueprint, request, jsonify, current_app
+from models.job_model import JobRepository, parse_sort, parse_status, split_skills
+from utils import facets as facet_counts
+from utils.geo import find_place, find_region, parse_near
+from utils.salary import salary_filter
 
 jobs_bp = Blueprint('jobs', __name__)
 
-@jobs_bp.route('/search', methods=['GET'])
-def search_jobs():
-    mysql = current_app.extensions['mysql']
-    cursor = mysql.connection.cursor()
-
-    skill = request.args.get('skill', type=str)
-    min_yoe = request.args.get('min_yoe', type=int)
-    max_yoe = request.args.get('max_yoe', type=int)
-    status = request.args.get('status', default='open', type=str)
-
-    query = """
-        SELECT id, title, company, description, location, posted_at, salary, num_applications, 
-               work_mode, yoe, skills, is_closed 
-        FROM jobs 
-        WHERE 1=1
-    """
-    params = []
-
-    # Filter by skill (case-insensitive)
-    if skill:
-        query += " AND LOWER(skills) LIKE %s"
-        params.append(f"%{skill.lower()}%")
-
-    # Filter by min yoe, only if numeric yoe stored
-    if min_yoe is not None:
-        query += " AND yoe REGEXP '^[0-9]+$' AND CAST(yoe AS UNSIGNED) >= %s"
-        params.append(min_yoe)
-
-    # Filter by max yoe, only if numeric yoe stored
-    if max_yoe is not None:
-        query += " AND yoe REGEXP '^[0-9]+$' AND CAST(yoe AS UNSIGNED) <= %s"
-        params.append(max_yoe)
-
-    # Status filtering
-    if status == 'open':
-        query += " AND is_closed = FALSE"
-    elif status == 'closed':
-        query += " AND is_closed = TRUE"
-
-    # If no filters are applied, return all jobs
-    cursor.execute(query, tuple(params))
-    jobs = cursor.fetchall()
-    cursor.close()
+# Reads the search filters, sort and requested facets from the query string. Shared with the
+# ASGI handler in routes/async_routes.py; raises ValueError with the message for a 400.
+def parse_search(args):
+    # Location filters: city/region, or near=<lat,lon or city>&radius_km=. Remote jobs always match.
+    # city and region are resolved through the gazetteer, as job locations are when saved.
+    location = {}
+    city = args.get('city', type=str)
+    if city:
+        place = find_place(city)
+        if not place:
+            raise ValueError(f"Unknown city: {city}")
+        location["city"] = place["city"]
+    region = args.get('region', type=str)
+    if region:
+        location["region"] = find_region(region)
+        if not location["region"]:
+            raise ValueError(f"Unknown region: {region}")
+    near = args.get('near', type=str)
+    if near:
+        radius_km = args.get('radius_km', default=25, type=float)
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        location["near"] = (*parse_near(near), radius_km)
+    location = {k: v for k, v in location.items() if v} or None
+
+    # status=open (default), closed or all
+    status = parse_status(args.get('status', type=str))
+
+    # sort=newest (default), applications or salary, and the salary range on the parsed, annualized
+    # salary columns; salary bounds and sort=salary need a currency
+    sort = parse_sort(args.get('sort', type=str))
+    salary = salary_filter(args, sort)
+
+    # Optional facet counts (work_mode, location, yoe, skills) for the same filters
+    facets = facet_counts.parse_facets(args.get('facets', type=str))
 
+    filters = dict(skill=args.get('skill', type=str), min_yoe=args.get('min_yoe', type=int),
+                   max_yoe=args.get('max_yoe', type=int), status=status, work_mode=args.get('work_mode', type=str),
+                   location=location, salary=salary)
+    return filters, sort, facets
+
+
+# Facets of unfiltered searches are shared by everyone, so they are cached briefly
+def is_unfiltered(filters):
+    return all(value is None or value == "" for name, value in filters.items() if name != "status")
+
+
+def search_response(jobs, facets, counts):
     jobs_list = []
     for job in jobs:
         jobs_list.append({
-            "id": job[0],
-            "title": job[1],
-            "company": job[2],
-            "description": job[3],
-            "location": job[4],
-            "posted_at": job[5].isoformat() if job[5] else None,
-            "salary": job[6],
-            "num_applications": job[7],
-            "work_mode": job[8],
-            "yoe": job[9],
-            "skills": job[10].split(",") if job[10] else [],
-            "is_closed": job[11]
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "location": job["location"],
+            "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None,
+            "salary": job["salary"],
+            "num_applications": job["num_applications"],
+            "work_mode": job["work_mode"],
+            "yoe": job["yoe"],
+            "skills": split_skills(job["skills"]),
+            "is_closed": job["is_closed"]
         })
 
-    return jsonify({"jobs": jobs_list}), 200
+    response = {"jobs": jobs_list}
+    if facets:
+        response["facets"] = counts
+    return response
+
+
+@jobs_bp.route('/search', methods=['GET'])
+def search_jobs():
+    try:
+        filters, sort, facets = parse_search(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    unfiltered = is_unfiltered(filters)
+    counts = facet_counts.get_cached(filters["status"], facets) if facets and unfiltered else None
+
+    # If no filters are applied, return all jobs with the given status
+    jobs_repo = JobRepository()
+    jobs = jobs_repo.search(**filters, sort=sort)
+    if facets and counts is None:
+        counts = facet_counts.fold_facets(jobs_repo.facets(facets, **filters), facets)
+        if unfiltered:
+            facet_counts.set_cached(filters["status"], facets, counts, current_app.config.get('FACET_CACHE_SECONDS', 60))
+
+    return jsonify(search_response(jobs, facets, counts)), 200
+
+### `flask jobs normalize-locations`- normalizes the locations of existing rows
+@jobs_bp.cli.command('normalize-locations')
+@click.option('--batch-size', default=500, show_default=True)
+def normalize_locations(batch_size):
+    last_id = JobRepository().backfill_locations(batch_size=batch_size)
+    print(f"Normalized job locations up to id {last_id}")
+
+### `flask jobs parse-salaries`- parses the salaries of existing rows
+@jobs_bp.cli.command('parse-salaries')
+@click.option('--batch-size', default=500, show_default=True)
+def parse_salaries(batch_size):
+    last_id = JobRepository().backfill_salaries(batch_size=batch_size)
+    print(f"Parsed job salaries up to id {last_id}")
+
+### `flask jobs sweep`- closes expired postings and archives long-closed ones with their applications.
+### Runs once, e.g. from cron, or keeps running in the background with --interval.
+@jobs_bp.cli.command('sweep')
+@click.option('--max-age-days', type=int, default=None, help="Defaults to JOB_MAX_AGE_DAYS, 0 skips closing")
+@click.option('--archive-after-days', type=int, default=None, help="Defaults to ARCHIVE_AFTER_DAYS")
+@click.option('--batch-size', type=int, default=None, help="Defaults to ARCHIVE_BATCH_SIZE")
+@click.option('--interval', type=int, default=0, show_default=True, help="Seconds between sweeps, 0 runs once")
+def sweep(max_age_days, archive_after_days, batch_size, interval):
+    config = current_app.config
+    max_age_days = config['JOB_MAX_AGE_DAYS'] if max_age_days is None else max_age_days
+    archive_after_days = config['ARCHIVE_AFTER_DAYS'] if archive_after_days is None else archive_after_days
+    batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+
+    while True:
+        try:
+            jobs_repo = JobRepository()
+            closed = jobs_repo.close_expired(max_age_days, batch_size) if max_age_days > 0 else 0
+            archived = jobs_repo.archive_closed(archive_after_days, batch_size)
+            print(f"Closed {closed} expired jobs, archived {archived} closed jobs")
+        except Exception:
+            if not interval:
+                raise
+            current_app.logger.exception("Job sweep failed")
+        if not interval:
+            return
+        time.sleep(interval)
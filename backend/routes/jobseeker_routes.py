@@ -2,6 +2,13 @@ import os
 from flask import Blueprint, jsonify, current_app, request, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
+from models.user_model import UserRepository
+from models.job_model import JobRepository, parse_sort, split_skills
+from models.application_model import ApplicationRepository
+from models.saved_search_model import SavedSearchRepository, MAX_SAVED_SEARCHES, normalize_saved_skill
+from utils.geo import find_place
+from utils.recommender import job_index, normalize_skill
+from utils.salary import salary_filter
 
 jobseeker_bp = Blueprint('jobseeker', __name__)
 
@@ -21,22 +28,16 @@ def profile():
         # Get the user ID from the JWT token
         user_id = int(get_jwt_identity())
 
-        # Access MySQL connection from the app context using cursor to get user profile
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT id, name, email, role FROM users WHERE id = %s", (user_id,))
-        user = cur.fetchone()
-        cur.close()
-
+        user = UserRepository().get_profile(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
 
         # Convert the user data to a dictionary for JSON response
         user_data = {
-            "id": user[0],
-            "name": user[1],
-            "email": user[2],
-            "role": user[3]
+            "id": user["id"],
+            "name": user["name"],
+            "email": user["email"],
+            "role": user["role"]
         }
 
         return jsonify({"profile": user_data}), 200
@@ -44,6 +45,32 @@ def profile():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Response body of /jobs, shared with the ASGI handler in routes/async_routes.py
+def jobs_page(total, page, per_page, jobs):
+    jobs_list = []
+    for job in jobs:
+        jobs_list.append({
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "location": job["location"],
+            "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None,  # Convert datetime to ISO string
+            "salary": job["salary"],
+            "num_applications": job["num_applications"],
+            "work_mode": job["work_mode"],
+            "yoe": job["yoe"],
+            "skills": job["skills"]
+        })
+
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page,
+        "jobs": jobs_list
+    }
+
 ### /jobs endpoint to get all jobs
 @jobseeker_bp.route('/jobs', methods=['GET'])
 def list_jobs():
@@ -53,46 +80,74 @@ def list_jobs():
         page = request.args.get('page', default=1, type=int)
         per_page = request.args.get('per_page', default=10, type=int)
         offset = (page - 1) * per_page
+        # sort=newest (default), applications or salary, and the optional salary range
+        # (min_salary, max_salary, currency); salary bounds and sort=salary need a currency
+        try:
+            sort = parse_sort(request.args.get('sort', type=str))
+            salary = salary_filter(request.args, sort)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Total count for pagination metadata and the page itself
+        jobs_repo = JobRepository()
+        total = jobs_repo.count(salary=salary)
+        jobs = jobs_repo.list_page(per_page, offset, salary=salary, sort=sort)
+
+        return jsonify(jobs_page(total, page, per_page, jobs)), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-
-        # Total count for pagination metadata
-        cur.execute("SELECT COUNT(*) FROM jobs")
-        total = cur.fetchone()[0]
-
-        # Fetch jobs with pagination
-        cur.execute("""
-        SELECT id, title, company, description, location, posted_at, salary, num_applications, work_mode, yoe, skills " \
-        FROM jobs
-        LIMIT %s OFFSET %s 
-        """, (per_page, offset))
-        jobs = cur.fetchall()
-        cur.close()
-
-        jobs_list = []
-        for job in jobs:
-            jobs_list.append({
-                "id": job[0],
-                "title": job[1],
-                "company": job[2],
-                "description": job[3],
-                "location": job[4],
-                "posted_at": job[5].isoformat() if job[5] else None,  # Convert datetime to ISO string
-                "salary": job[6],
-                "num_applications": job[7],
-                "work_mode": job[8],
-                "yoe": job[9],
-                "skills": job[10]
+### /recommendations endpoint to recommend open jobs from the caller's skills, yoe and past applications
+@jobseeker_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+def recommend_jobs():
+    try:
+        user_id = int(get_jwt_identity())
+        skills = [s for s in request.args.get('skills', default='', type=str).split(',') if s.strip()]
+        yoe = request.args.get('yoe', type=int)
+        limit = max(1, min(request.args.get('limit', default=10, type=int), 100))
+
+        # The index is loaded and refreshed by a background thread; a worker still loading it
+        # answers right away instead of holding a thread until it is done
+        job_index.start(current_app._get_current_object())
+        if not job_index.wait_until_loaded(timeout=0):
+            return jsonify({"error": "Recommendations are not available yet, try again shortly"}), 503
+
+        jobs_repo = JobRepository()
+
+        # Skills of jobs applied to before count at half weight, and those jobs are excluded
+        applied = ApplicationRepository(jobs_repo.connection).list_job_skills_for_user(user_id)
+        skill_weights = {}
+        for app in applied:
+            for skill in split_skills(app["skills"]):
+                skill_weights[normalize_skill(skill)] = 0.5
+        for skill in skills:
+            skill_weights[normalize_skill(skill)] = 1.0
+
+        ranked = job_index.recommend(skill_weights, yoe=yoe,
+                                     exclude_ids={app["job_id"] for app in applied}, k=limit)
+        jobs = jobs_repo.get_many([job_id for job_id, _ in ranked])
+
+        recommendations = []
+        for job_id, score in ranked:
+            job = jobs.get(job_id)
+            if not job or job["is_closed"]:  # changed since the index was built
+                continue
+            recommendations.append({
+                "id": job["id"],
+                "title": job["title"],
+                "company": job["company"],
+                "location": job["location"],
+                "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None,
+                "salary": job["salary"],
+                "work_mode": job["work_mode"],
+                "yoe": job["yoe"],
+                "skills": split_skills(job["skills"]),
+                "score": round(score, 4)
             })
 
-        return jsonify({
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
-            "jobs": jobs_list
-        }), 200
+        return jsonify({"recommendations": recommendations}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -111,36 +166,51 @@ def apply_to_job():
         if not job_id:
             return jsonify({"error": "Job ID is required"}), 400
 
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
+        applications_repo = ApplicationRepository()
 
         # Check if job exists and still open
-        cur.execute("SELECT id, is_closed FROM jobs WHERE id = %s", (job_id,))
-        job = cur.fetchone()
+        job = JobRepository(applications_repo.connection).get(job_id)
         if not job:
             return jsonify({"error": "Job not found"}), 404
-        if job[1]:  # is_closed is True
+        if job["is_closed"]:
             return jsonify({"error": "This job is closed and no longer accepting applications"}), 400
 
         # Check if already applied
-        cur.execute("SELECT * FROM applications WHERE user_id = %s AND job_id = %s", (user_id, job_id))
-        if cur.fetchone():
+        if applications_repo.exists(user_id, job_id):
             return jsonify({"error": "Already applied to this job"}), 400
 
-        # Insert into applications
-        cur.execute("INSERT INTO applications (user_id, job_id) VALUES (%s, %s)", (user_id, job_id))
-
-        # Update num_applications
-        cur.execute("UPDATE jobs SET num_applications = num_applications + 1 WHERE id = %s", (job_id,))
-
-        mysql.connection.commit()
-        cur.close()
+        # Insert into applications and update num_applications
+        applications_repo.create(user_id, job_id)
 
         return jsonify({"message": "Applied to job successfully"}), 201
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Response body of /applications, shared with the ASGI handler in routes/async_routes.py
+def applications_page(total, page, per_page, applications):
+    applied_jobs = []
+    for app in applications:
+        applied_jobs.append({
+            "job_id": app["job_id"],
+            "title": app["title"],
+            "company": app["company"],
+            "description": app["description"],
+            "location": app["location"],
+            "posted_at": app["posted_at"].isoformat() if app["posted_at"] else None,
+            "salary": app["salary"],
+            "applied_at": app["applied_at"].isoformat() if app["applied_at"] else None,
+            "is_archived": bool(app.get("is_archived"))
+        })
+
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page,
+        "applications": applied_jobs
+    }
+
 ### /Applications endpoint to list all job applications for the user
 @jobseeker_bp.route('/applications', methods=['GET'])
 @jwt_required()
@@ -151,47 +221,135 @@ def list_applications():
         page = request.args.get('page', default=1, type=int)
         per_page = request.args.get('per_page', default=10, type=int)
         offset = (page - 1) * per_page
+        # include_archived=true also lists applications to archived postings
+        include_archived = request.args.get('include_archived', default='false').lower() == 'true'
 
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-
-         # Total count of applications for pagination metadata
-        cur.execute("SELECT COUNT(*) FROM applications WHERE user_id = %s", (user_id,))
-        total = cur.fetchone()[0]
-
-        # Join applications with jobs to get job details for this user
-        query = """
-            SELECT jobs.id, jobs.title, jobs.company, jobs.description, jobs.location, jobs.posted_at, jobs.salary, applications.applied_at
-            FROM applications
-            JOIN jobs ON applications.job_id = jobs.id
-            WHERE applications.user_id = %s
-            ORDER BY applications.applied_at DESC
-            LIMIT %s OFFSET %s
-        """
-        cur.execute(query, (user_id, per_page, offset))
-        applications = cur.fetchall()
-        cur.close()
-
-        applied_jobs = []
-        for app in applications:
-            applied_jobs.append({
-                "job_id": app[0],
-                "title": app[1],
-                "company": app[2],
-                "description": app[3],
-                "location": app[4],
-                "posted_at": app[5].isoformat() if app[5] else None,
-                "salary": app[6],
-                "applied_at": app[7].isoformat() if app[7] else None
-            })
+        # Total count of applications for pagination metadata and the page of
+        # applications joined with jobs
+        applications_repo = ApplicationRepository()
+        total = applications_repo.count_for_user(user_id, include_archived)
+        applications = applications_repo.list_for_user(user_id, per_page, offset, include_archived)
+
+        return jsonify(applications_page(total, page, per_page, applications)), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+### /saved-searches endpoint to save a search, new postings matching it land in the inbox
+@jobseeker_bp.route('/saved-searches', methods=['POST'])
+@jwt_required()
+def create_saved_search():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json() or {}
+
+        search = {
+            "name": data.get("name"),
+            "skill": normalize_saved_skill(data.get("skill")),
+            "min_yoe": data.get("min_yoe"),
+            "max_yoe": data.get("max_yoe"),
+            "work_mode": data.get("work_mode"),
+            "location_city": None,
+            "min_salary": data.get("min_salary"),
+            "salary_currency": (data.get("currency") or "").strip().upper() or None,
+        }
+        # New postings are matched through the skill index, so every saved search needs a skill
+        if not search["skill"]:
+            return jsonify({"error": "skill is required"}), 400
+        for field in ("min_yoe", "max_yoe", "min_salary"):
+            if search[field] is not None and (isinstance(search[field], bool) or
+                                              not isinstance(search[field], (int, float))):
+                return jsonify({"error": f"{field} must be a number"}), 400
+        # Salaries are only compared within one currency, as in search
+        if search["min_salary"] is not None and not search["salary_currency"]:
+            return jsonify({"error": "currency is required with min_salary"}), 400
+        # Postings store the gazetteer's city name, so aliases such as Bangalore become Bengaluru
+        if data.get("city"):
+            place = find_place(str(data["city"]))
+            if not place:
+                return jsonify({"error": f"Unknown city: {data['city']}"}), 400
+            search["location_city"] = place["city"]
+
+        saved_searches_repo = SavedSearchRepository()
+        if saved_searches_repo.count_for_user(user_id) >= MAX_SAVED_SEARCHES:
+            return jsonify({"error": f"At most {MAX_SAVED_SEARCHES} saved searches are allowed"}), 400
+
+        search_id = saved_searches_repo.create(user_id, search)
+        return jsonify({"message": "Search saved successfully", "id": search_id}), 201
 
-        return jsonify({
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page,
-            "applications": applied_jobs
-        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+### /saved-searches endpoint to list the user's saved searches
+@jobseeker_bp.route('/saved-searches', methods=['GET'])
+@jwt_required()
+def list_saved_searches():
+    try:
+        user_id = int(get_jwt_identity())
+        searches = SavedSearchRepository().list_for_user(user_id)
+
+        return jsonify({"saved_searches": [
+            {
+                "id": s["id"],
+                "name": s["name"],
+                "skill": s["skill"],
+                "min_yoe": s["min_yoe"],
+                "max_yoe": s["max_yoe"],
+                "work_mode": s["work_mode"],
+                "city": s["location_city"],
+                "min_salary": float(s["min_salary"]) if s["min_salary"] is not None else None,
+                "currency": s["salary_currency"],
+                "created_at": s["created_at"].isoformat() if s["created_at"] else None
+            } for s in searches
+        ]}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+### /saved-searches/<id> endpoint to delete a saved search along with its matches
+@jobseeker_bp.route('/saved-searches/<int:search_id>', methods=['DELETE'])
+@jwt_required()
+def delete_saved_search(search_id):
+    try:
+        user_id = int(get_jwt_identity())
+        if not SavedSearchRepository().delete(search_id, user_id):
+            return jsonify({"error": "Saved search not found"}), 404
+
+        return jsonify({"message": "Saved search deleted successfully"}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+### /saved-searches/inbox endpoint with the postings that matched the user's saved searches.
+### Pass the highest id seen as after_id to get the matches after it, oldest first; repeat with the
+### highest id returned until the list comes back empty.
+@jobseeker_bp.route('/saved-searches/inbox', methods=['GET'])
+@jwt_required()
+def saved_search_inbox():
+    try:
+        user_id = int(get_jwt_identity())
+        after_id = request.args.get('after_id', type=int)
+        limit = max(1, min(request.args.get('limit', default=20, type=int), 100))
+
+        matches = SavedSearchRepository().inbox(user_id, limit, after_id)
+
+        return jsonify({"matches": [
+            {
+                "id": m["id"],
+                "saved_search_id": m["saved_search_id"],
+                "matched_at": m["matched_at"].isoformat() if m["matched_at"] else None,
+                "job": {
+                    "id": m["job_id"],
+                    "title": m["title"],
+                    "company": m["company"],
+                    "location": m["location"],
+                    "work_mode": m["work_mode"],
+                    "yoe": m["yoe"],
+                    "salary": m["salary"],
+                    "posted_at": m["posted_at"].isoformat() if m["posted_at"] else None
+                }
+            } for m in matches
+        ]}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -219,11 +377,7 @@ def upload_resume():
         file.save(file_path)
 
         # Save file_path or relative path in DB (you might want a new column in users or resumes table)
-        mysql = current_app.extensions['mysql']
-        cur = mysql.connection.cursor()
-        cur.execute("UPDATE users SET resume_path = %s WHERE id = %s", (file_path, user_id))
-        mysql.connection.commit()
-        cur.close()
+        UserRepository().set_resume_path(user_id, file_path)
 
         return jsonify({"message": "Resume uploaded successfully"}), 201
     else:
@@ -235,17 +389,10 @@ def upload_resume():
 def get_resume():
     user_id = int(get_jwt_identity())
 
-    mysql = current_app.extensions['mysql']
-    cur = mysql.connection.cursor()
-    cur.execute("SELECT resume_path FROM users WHERE id = %s", (user_id,))
-    result = cur.fetchone()
-    cur.close()
-
-    if not result or not result[0]:
+    resume_path = UserRepository().get_resume_path(user_id)
+    if not resume_path:
         return jsonify({"error": "Resume not found"}), 404
 
-    resume_path = result[0]
-
     try:
         return send_file(resume_path, as_attachment=True)
     except FileNotFoundError:
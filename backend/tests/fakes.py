@@ -0,0 +1,104 @@
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastrowid = 0
+        self.rowcount = 0
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        connection = self.connection
+        connection.statements.append((sql, params))
+        if sql.lstrip().upper().startswith("SELECT") or sql.lstrip().startswith("("):
+            self.rows = list(connection.rows.pop(0)) if connection.rows else []
+            self.rowcount = len(self.rows)
+        else:
+            self.lastrowid, self.rowcount = connection.results.pop(0) if connection.results else (0, 0)
+
+    def executemany(self, sql, seq_of_params):
+        for params in seq_of_params:
+            self.connection.statements.append((sql, params))
+        self.rowcount = len(seq_of_params)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records statements, commits and rollbacks. SELECTs return the next entry of rows (a list
+    of rows), other statements the next (lastrowid, rowcount) of results."""
+
+    def __init__(self, results=(), rows=()):
+        self.results = list(results)
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    # Statements whose SQL contains all the given fragments
+    def find(self, *fragments):
+        return [(sql, params) for sql, params in self.statements if all(f in sql for f in fragments)]
+
+
+class SqliteConnection:
+    """Runs the repositories' MySQL-flavoured SQL on an in-memory SQLite database, for statements
+    that only use the common subset: %s placeholders and INSERT IGNORE are translated."""
+
+    def __init__(self, schema):
+        import sqlite3
+
+        self.db = sqlite3.connect(":memory:")
+        self.db.row_factory = lambda cur, row: {col[0]: value for col, value in zip(cur.description, row)}
+        self.db.executescript(schema)
+
+    def cursor(self, cursor_class=None):
+        return SqliteCursor(self.db.cursor(), dicts=cursor_class is not None)
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+
+class SqliteCursor:
+    def __init__(self, cursor, dicts):
+        self.cursor = cursor
+        self.dicts = dicts
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE"), params)
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def _row(self, row):
+        return row if self.dicts or row is None else tuple(row.values())
+
+    def fetchone(self):
+        return self._row(self.cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self.cursor.fetchall()]
+
+    def close(self):
+        self.cursor.close()
@@ -0,0 +1,112 @@
+import pytest
+
+from models.application_model import ApplicationRepository
+from models.db import union_page
+from models.job_model import JobRepository
+from tests.fakes import FakeConnection, SqliteConnection
+
+JOBS_TABLE = """(
+    id INTEGER PRIMARY KEY, title TEXT, company TEXT, description TEXT, location TEXT, posted_by INT,
+    posted_at TEXT, salary TEXT, num_applications INT DEFAULT 0, work_mode TEXT, yoe TEXT,
+    is_closed BOOLEAN DEFAULT FALSE, skills TEXT, location_city TEXT, salary_max REAL, salary_currency TEXT
+)"""
+APPLICATIONS_TABLE = "(id INTEGER PRIMARY KEY, user_id INT, job_id INT, applied_at TEXT)"
+SCHEMA = f"""
+CREATE TABLE jobs {JOBS_TABLE};
+CREATE TABLE jobs_archive {JOBS_TABLE};
+CREATE TABLE applications {APPLICATIONS_TABLE};
+CREATE TABLE applications_archive {APPLICATIONS_TABLE};
+CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT);
+INSERT INTO users VALUES (1, 'Asha', 'asha@example.com');
+INSERT INTO jobs (id, title, posted_by) VALUES (1, 'live', 9);
+INSERT INTO jobs_archive (id, title, posted_by, is_closed) VALUES (2, 'archived', 9, TRUE);
+INSERT INTO applications VALUES (1, 1, 1, '2026-01-02');
+INSERT INTO applications_archive VALUES (2, 1, 2, '2026-01-01');
+"""
+
+
+@pytest.fixture
+def connection():
+    return SqliteConnection(SCHEMA)
+
+
+def test_union_page_limits_each_branch_to_limit_plus_offset():
+    sql, params = union_page(["SELECT id FROM jobs WHERE a = %s", "SELECT id FROM jobs_archive WHERE a = %s"],
+                             [7], "id DESC", 10, 20)
+    assert sql == ("(SELECT id FROM jobs WHERE a = %s ORDER BY id DESC LIMIT %s) UNION ALL "
+                   "(SELECT id FROM jobs_archive WHERE a = %s ORDER BY id DESC LIMIT %s) "
+                   "ORDER BY id DESC LIMIT %s OFFSET %s")
+    assert params == [7, 30, 7, 30, 10, 20]
+
+
+def test_page_query_reads_the_archive_only_when_asked():
+    sql, params = JobRepository.page_query(10, 0, posted_by=9, include_archived=True)
+    assert "FROM jobs_archive" in sql and "1 AS is_archived" in sql
+    assert params == [9, 10, 9, 10, 10, 0]
+    sql, _ = JobRepository.page_query(10, 0, posted_by=9)
+    assert "jobs_archive" not in sql
+
+
+def test_get_falls_back_to_the_archive(connection):
+    jobs = JobRepository(connection)
+    assert jobs.get(2) is None
+    job = jobs.get(2, posted_by=9, include_archived=True)
+    assert job["title"] == "archived" and job["is_archived"]
+    assert "is_archived" not in jobs.get(1, include_archived=True)
+
+
+def test_counts_include_the_archive_only_when_asked(connection):
+    jobs = JobRepository(connection)
+    assert jobs.count(posted_by=9) == 1
+    assert jobs.count(posted_by=9, include_archived=True) == 2
+    applications = ApplicationRepository(connection)
+    assert applications.count_for_user(1) == 1
+    assert applications.count_for_user(1, include_archived=True) == 2
+
+
+def test_application_lists_read_the_archive(connection):
+    applications = ApplicationRepository(connection)
+    assert [a["applicant_id"] for a in applications.list_for_job(2, archived=True)] == [1]
+    assert applications.list_for_job(2) == []
+    rows = applications.list_all(include_archived=True)
+    assert [(row["title"], row["is_archived"]) for row in rows] == [("live", 0), ("archived", 1)]
+
+
+def test_archive_closed_moves_jobs_with_their_applications_in_batches():
+    connection = FakeConnection(rows=[[{"id": 1}, {"id": 2}], [{"id": 3}]])
+    assert JobRepository(connection).archive_closed(after_days=30, batch_size=2) == 3
+
+    statements = [sql.split()[0:3] for sql, _ in connection.statements]
+    assert statements[:6] == [["SELECT", "id", "FROM"],
+                              ["INSERT", "INTO", "applications_archive"], ["INSERT", "INTO", "jobs_archive"],
+                              ["DELETE", "FROM", "saved_search_matches"], ["DELETE", "FROM", "applications"],
+                              ["DELETE", "FROM", "jobs"]]
+    assert "FOR UPDATE" in connection.statements[0][0]
+    assert [params for sql, params in connection.statements if sql.startswith("DELETE FROM jobs")] == [(1, 2), (3,)]
+    # one transaction per batch
+    assert connection.commits == 2
+
+
+def test_archive_closed_stops_when_nothing_is_due():
+    connection = FakeConnection(rows=[[]])
+    assert JobRepository(connection).archive_closed(after_days=30) == 0
+    assert len(connection.statements) == 1
+
+
+def test_close_expired_measures_age_from_the_last_reopen():
+    # first batch closes 2 (a full batch), the second closes 1; each batch adds two stats rows
+    connection = FakeConnection(results=[(0, 2), (0, 0), (0, 0), (0, 1), (0, 0), (0, 0)])
+    assert JobRepository(connection).close_expired(max_age_days=90, batch_size=2) == 3
+
+    sql, params = connection.find("UPDATE jobs SET is_closed = TRUE")[0]
+    assert "reopened_at IS NULL OR reopened_at <" in sql
+    assert params == (90, 90, 2)
+
+
+def test_reopening_restarts_the_age_and_closing_does_not():
+    connection = FakeConnection(results=[(0, 1), (0, 0), (0, 0), (0, 1)])
+    jobs = JobRepository(connection)
+    jobs.set_closed(1, False)
+    assert "reopened_at = CURRENT_TIMESTAMP" in connection.statements[0][0]
+    jobs.set_closed(1, True)
+    assert "reopened_at" not in connection.find("UPDATE jobs SET is_closed")[-1][0]
@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+from flask import Flask
+
+pytest.importorskip("starlette")
+pytest.importorskip("a2wsgi")
+pytest.importorskip("aiomysql")
+import jwt
+from starlette.testclient import TestClient
+
+from models import db
+from models.aio import AsyncDatabase
+from routes.async_routes import create_asgi_app
+
+SECRET = "test-secret-of-at-least-32-bytes-long"
+
+
+class FakeRepository:
+    """Answers COUNT queries with a total and everything else with no rows. Each query waits
+    until the other one of its request has started, so they only finish if run concurrently."""
+
+    def __init__(self, role='admin'):
+        self.role = role
+        self.started = None
+        self.queries = []
+
+    async def _run(self, sql):
+        self.queries.append(sql)
+        if "role FROM users" in sql:
+            return self.role
+        await asyncio.wait_for(self.started.wait(), timeout=1)
+        return 3 if "COUNT(*)" in sql else []
+
+    async def scalar(self, sql, params=()):
+        return await self._run(sql)
+
+    async def fetchall(self, sql, params=()):
+        return await self._run(sql)
+
+
+class FakeDatabase:
+    def __init__(self, repo):
+        self.repo = repo
+        self.user_ids = []
+
+    async def repository(self, request, user_id=None):
+        self.user_ids.append(user_id)
+        self.repo.started = Gate(2)
+        return self.repo
+
+    async def close(self):
+        pass
+
+
+class Gate:
+    """Opens once `count` waiters have arrived."""
+
+    def __init__(self, count):
+        self.count = count
+        self.event = asyncio.Event()
+
+    async def wait(self):
+        self.count -= 1
+        if self.count <= 0:
+            self.event.set()
+        await self.event.wait()
+
+
+@pytest.fixture
+def client_and_db():
+    flask_app = Flask(__name__)
+    flask_app.config.update(JWT_SECRET_KEY=SECRET)
+
+    @flask_app.route('/api/auth/ping')
+    def ping():
+        return {"served_by": "flask"}
+
+    app = create_asgi_app(flask_app)
+    database = FakeDatabase(FakeRepository())
+    app.state.database = database
+    with TestClient(app) as client:
+        yield client, database
+
+
+def token(sub="7", **claims):
+    return jwt.encode({"sub": sub, "type": "access", "exp": int(time.time()) + 60, **claims}, SECRET, algorithm="HS256")
+
+
+def test_list_runs_count_and_page_concurrently(client_and_db):
+    client, database = client_and_db
+    response = client.get("/api/jobs?page=2&per_page=2")
+    assert response.status_code == 200
+    assert response.json() == {"total": 3, "page": 2, "per_page": 2, "total_pages": 2, "jobs": []}
+    assert database.user_ids == [None]
+
+
+def test_authenticated_list_routes_with_the_jwt_identity(client_and_db):
+    client, database = client_and_db
+    response = client.get("/api/applications", headers={"Authorization": f"Bearer {token()}"})
+    assert response.status_code == 200 and response.json()["total"] == 3
+    assert database.user_ids == [7]
+
+
+def test_missing_expired_and_invalid_tokens(client_and_db):
+    client, _ = client_and_db
+    assert client.get("/api/employer/jobs").status_code == 401
+    expired = jwt.encode({"sub": "7", "type": "access", "exp": int(time.time()) - 10}, SECRET, algorithm="HS256")
+    assert client.get("/api/employer/jobs", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+    forged = jwt.encode({"sub": "7", "type": "access"}, "another-secret-of-at-least-32-bytes", algorithm="HS256")
+    assert client.get("/api/employer/jobs", headers={"Authorization": f"Bearer {forged}"}).status_code == 422
+
+
+def test_admin_list_requires_the_admin_role(client_and_db):
+    client, database = client_and_db
+    database.repo.role = 'jobseeker'
+    assert client.get("/api/admin/jobs", headers={"Authorization": f"Bearer {token()}"}).status_code == 403
+
+
+def test_bad_arguments_are_rejected_before_querying(client_and_db):
+    client, database = client_and_db
+    assert client.get("/api/jobs?sort=salary").status_code == 400
+    assert client.get("/api/jobs/search?facets=colour").status_code == 400
+    assert database.user_ids == []
+
+
+def test_other_routes_fall_through_to_flask(client_and_db):
+    client, _ = client_and_db
+    assert client.get("/api/auth/ping").json() == {"served_by": "flask"}
+
+
+def test_async_reads_follow_the_read_your_writes_rules(monkeypatch):
+    flask_app = Flask(__name__)
+    flask_app.config.update(MYSQL_REPLICA_HOSTS=['replica'], READ_YOUR_WRITES_CHECK_SECONDS=1)
+    database = AsyncDatabase(flask_app)
+    monkeypatch.setattr(db, '_recent_writes', {7: time.monotonic() + 5})
+    monkeypatch.setattr(db, '_checked_until', {8: time.monotonic() + 5})
+
+    class Request:
+        def __init__(self, method='GET', headers=None):
+            self.method, self.headers = method, headers or {}
+
+    async def routes():
+        return [
+            await database.reads_from_replica(Request('POST'), None),
+            await database.reads_from_replica(Request(), None),
+            await database.reads_from_replica(Request(), 7),
+            await database.reads_from_replica(Request(), 8),
+            await database.reads_from_replica(Request(headers={db.READ_YOUR_WRITES_HEADER: str(time.time() + 3)}), 8),
+        ]
+
+    assert asyncio.run(routes()) == [False, True, False, True, False]
@@ -0,0 +1,40 @@
+import pytest
+
+from models.db import Repository, expand_in
+from tests.fakes import FakeConnection
+
+
+def test_execute_returns_lastrowid_for_inserts_and_rowcount_otherwise():
+    repo = Repository(FakeConnection(results=[(42, 1), (0, 3)]))
+    assert repo.execute("INSERT INTO jobs (title) VALUES (%s)", ["a"]) == 42
+    assert repo.execute("UPDATE jobs SET is_closed = TRUE") == 3
+
+
+def test_nested_transactions_commit_once_at_the_outermost_block():
+    connection = FakeConnection()
+    outer = Repository(connection)
+    with outer.transaction():
+        with Repository(connection).transaction():
+            outer.execute("UPDATE jobs SET is_closed = TRUE")
+        assert connection.commits == 0
+    assert connection.commits == 1 and connection.rollbacks == 0
+
+
+def test_error_in_nested_transaction_rolls_back_the_outermost_block():
+    connection = FakeConnection()
+    repo = Repository(connection)
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            with repo.transaction():
+                raise RuntimeError("boom")
+    assert connection.commits == 0 and connection.rollbacks == 1
+    # the depth is reset, so the next block commits again
+    with repo.transaction():
+        pass
+    assert connection.commits == 1
+
+
+def test_expand_in():
+    assert expand_in("SELECT * FROM jobs WHERE id IN %s AND x = %s", 3) == \
+        "SELECT * FROM jobs WHERE id IN (%s, %s, %s) AND x = %s"
+
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from flask import Flask
+
+from models import db
+
+
+class LookupConnection:
+    """Answers the recent_writes lookup with a fixed row and counts the queries."""
+
+    lastrowid = 0
+    rowcount = 1
+
+    def __init__(self, remaining=None):
+        self.remaining = remaining
+        self.queries = 0
+        self.commits = 0
+
+    def cursor(self, cursor_class=None):
+        return self
+
+    def execute(self, sql, params):
+        self.queries += 1
+
+    def fetchone(self):
+        return (self.remaining,) if self.remaining is not None else None
+
+    def close(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.config.update(MYSQL_REPLICA_HOSTS=['replica'], READ_YOUR_WRITES_SECONDS=5, READ_YOUR_WRITES_CHECK_SECONDS=1)
+    monkeypatch.setattr(db, '_current_user_id', lambda: 7)
+    monkeypatch.setattr(db, '_recent_writes', {})
+    monkeypatch.setattr(db, '_checked_until', {})
+    return app
+
+
+def use_primary(monkeypatch, connection):
+    monkeypatch.setattr(db, 'primary_connection', lambda: connection)
+
+
+def test_writes_and_anonymous_reads(app, monkeypatch):
+    with app.test_request_context(method='POST'):
+        assert not db.reads_from_replica()
+    monkeypatch.setattr(db, '_current_user_id', lambda: None)
+    with app.test_request_context(method='GET'):
+        assert db.reads_from_replica()
+
+
+def test_reader_without_recent_write_goes_to_replica_and_lookup_is_cached(app, monkeypatch):
+    primary = LookupConnection()
+    use_primary(monkeypatch, primary)
+    for _ in range(3):
+        with app.test_request_context(method='GET'):
+            assert db.reads_from_replica()
+    assert primary.queries == 1
+
+
+def test_recent_write_on_another_worker_keeps_reads_on_primary(app, monkeypatch):
+    primary = LookupConnection(remaining=4.5)
+    use_primary(monkeypatch, primary)
+    for _ in range(2):
+        with app.test_request_context(method='GET'):
+            assert not db.reads_from_replica()
+    assert primary.queries == 1
+
+
+def test_window_ends_after_the_deadline(app, monkeypatch):
+    use_primary(monkeypatch, LookupConnection())
+    db._recent_writes[7] = time.monotonic() - 0.1
+    with app.test_request_context(method='GET'):
+        assert db.reads_from_replica()
+
+
+def test_write_sets_header_and_local_window(app, monkeypatch):
+    primary = LookupConnection()
+    use_primary(monkeypatch, primary)
+    db._checked_until[7] = time.monotonic() + 60
+    with app.test_request_context(method='POST'):
+        response = db.track_writes(app.response_class(status=201))
+    deadline = float(response.headers[db.READ_YOUR_WRITES_HEADER])
+    assert time.time() < deadline <= time.time() + 5.01
+    assert 7 not in db._checked_until and primary.commits == 1
+    with app.test_request_context(method='GET'):
+        assert not db.reads_from_replica()
+
+
+def test_echoed_header_routes_without_lookup(app, monkeypatch):
+    primary = LookupConnection(remaining=4.5)
+    use_primary(monkeypatch, primary)
+    with app.test_request_context(method='GET', headers={db.READ_YOUR_WRITES_HEADER: f"{time.time() + 3:.3f}"}):
+        assert not db.reads_from_replica()
+    with app.test_request_context(method='GET', headers={db.READ_YOUR_WRITES_HEADER: f"{time.time() - 1:.3f}"}):
+        assert db.reads_from_replica()
+    assert primary.queries == 0
+
+
+def test_failed_replica_is_skipped_until_retry(app, monkeypatch):
+    attempts = []
+
+    def connect(**kwargs):
+        attempts.append(kwargs['host'])
+        raise db.MySQLdb.Error("unreachable")
+
+    app.config.update(MYSQL_USER='u', MYSQL_PASSWORD='p', MYSQL_DB='d')
+    monkeypatch.setattr(db, '_replicas_down', {})
+    monkeypatch.setattr(db.MySQLdb, 'connect', connect)
+    for _ in range(2):
+        with app.app_context():
+            assert db.get_replica_connection() is None
+    assert attempts == ['replica']
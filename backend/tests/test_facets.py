@@ -0,0 +1,50 @@
+import pytest
+
+from models.job_model import JobRepository
+from utils import facets
+
+
+def test_parse_facets_rejects_unknown_names():
+    assert facets.parse_facets("skills, work_mode,skills") == ("skills", "work_mode")
+    with pytest.raises(ValueError):
+        facets.parse_facets("salary")
+
+
+def test_facet_query_groups_each_facet_separately():
+    sql, params = JobRepository.facet_query(("work_mode", "skills"), work_mode="remote")
+
+    assert sql.count("GROUP BY facet_value") == 2
+    assert sql.count(" UNION ALL ") == 1
+    # each branch repeats the search filters
+    assert params.count("remote") == 2
+
+
+def test_skills_facet_binds_no_skill_text_into_json():
+    sql, params = JobRepository.facet_query(("skills",), skill="c++\n", work_mode="remote")
+
+    # the JSON_TABLE input is built from digits only, so nothing in a skill needs escaping
+    assert "REPEAT('0,'" in sql and "FOR ORDINALITY" in sql
+    assert sql.count("%s") == len(params)
+    assert "remote" in params
+
+
+def test_fold_facets_orders_values_by_count():
+    rows = [
+        {"facet": "work_mode", "facet_value": "onsite", "job_count": 2},
+        {"facet": "work_mode", "facet_value": None, "job_count": 1},
+        {"facet": "skills", "facet_value": "python", "job_count": 3},
+        {"facet": "work_mode", "facet_value": "remote", "job_count": 5},
+    ]
+
+    counts = facets.fold_facets(rows, ("work_mode", "skills", "yoe"))
+
+    assert list(counts["work_mode"].items()) == [("remote", 5), ("onsite", 2), ("unspecified", 1)]
+    assert counts["skills"] == {"python": 3}
+    assert counts["yoe"] == {}
+
+
+def test_cache_only_accepts_known_statuses():
+    facets.set_cached("open", ("yoe",), {"yoe": {}}, ttl=60)
+    assert facets.get_cached("open", ("yoe",)) == {"yoe": {}}
+    with pytest.raises(ValueError):
+        facets.set_cached("anything", ("yoe",), {}, ttl=60)
@@ -0,0 +1,57 @@
+import math
+import random
+
+import pytest
+
+from utils.geo import cell_degrees, covering_prefixes, encode_geohash
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def point_at(latitude, longitude, distance, bearing):
+    lat1, lon1, b = math.radians(latitude), math.radians(longitude), math.radians(bearing)
+    d = distance / 6371.0
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(b))
+    lon2 = lon1 + math.atan2(math.sin(b) * math.sin(d) * math.cos(lat1), math.cos(d) - math.sin(lat1) * math.sin(lat2))
+    return math.degrees(lat2), (math.degrees(lon2) + 540) % 360 - 180
+
+
+@pytest.mark.parametrize("latitude, longitude, precision, expected", [
+    (57.64911, 10.40744, 11, "u4pruydqqvj"),
+    (42.6, -5.6, 5, "ezs42"),
+    (-33.8688, 151.2093, 6, "r3gx2f"),
+    (0.0, 0.0, 1, "s"),
+])
+def test_encode_geohash(latitude, longitude, precision, expected):
+    assert encode_geohash(latitude, longitude, precision) == expected
+
+
+def test_cell_degrees():
+    assert cell_degrees(1) == (45.0, 45.0)
+    assert cell_degrees(2) == (5.625, 11.25)
+
+
+def test_covering_prefixes_reaches_london_from_the_east():
+    prefixes = covering_prefixes(51.5074, 0.1722, 60)
+    assert any(encode_geohash(51.5074, -0.1278).startswith(p) for p in prefixes)
+
+
+@pytest.mark.parametrize("latitude", [0, 12.97, 45, 52.52, 64, -38])
+@pytest.mark.parametrize("radius_km", [1, 5, 25, 100])
+def test_covering_prefixes_cover_every_point_in_the_circle(latitude, radius_km):
+    rng = random.Random(f"{latitude}/{radius_km}")
+    for _ in range(100):
+        centre = (latitude + rng.uniform(-1, 1), rng.uniform(-180, 180))
+        prefixes = covering_prefixes(*centre, radius_km)
+        assert len(prefixes) <= 9
+        point = point_at(*centre, rng.uniform(0, radius_km * 0.999), rng.uniform(0, 360))
+        assert distance_km(*centre, *point) <= radius_km
+        assert any(encode_geohash(*point).startswith(p) for p in prefixes), (centre, point, prefixes)
+
+
+def test_covering_prefixes_huge_radius_matches_everything():
+    assert covering_prefixes(10, 10, 20000) == [""]
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from utils.recommender import JobIndex
+
+
+def job(job_id, skills, yoe=None, is_closed=False, updated_at=None):
+    return {"id": job_id, "skills": skills, "yoe": yoe, "is_closed": is_closed, "updated_at": updated_at}
+
+
+class FakeJobs:
+    """Answers the two queries JobIndex issues, from a list of job rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar(self, sql, params=()):
+        return max(row["updated_at"] for row in self.rows)
+
+    def fetchall(self, sql, params=()):
+        if "updated_at >=" in sql:
+            since, _, last_id, limit = params
+            rows = sorted((r for r in self.rows if r["updated_at"] >= since and
+                           not (r["updated_at"] == since and r["id"] <= last_id)),
+                          key=lambda r: (r["updated_at"], r["id"]))
+            return rows[:limit]
+        last_id, limit = params
+        return [r for r in sorted(self.rows, key=lambda r: r["id"]) if not r["is_closed"] and r["id"] > last_id][:limit]
+
+
+def test_recommend_ranks_by_shared_skills():
+    index = JobIndex()
+    index.sync(job(1, "python,sql"))
+    index.sync(job(2, "python"))
+    index.sync(job(3, "java"))
+
+    ranked = index.recommend({"python": 1.0, "sql": 1.0}, k=10)
+
+    assert [job_id for job_id, _ in ranked] == [1, 2]
+    assert ranked[0][1] == 1.0
+
+
+def test_recommend_excludes_closed_and_excluded_jobs():
+    index = JobIndex()
+    for job_id in (1, 2, 3):
+        index.sync(job(job_id, "python"))
+    index.sync(job(2, "python", is_closed=True))
+
+    assert [job_id for job_id, _ in index.recommend({"python": 1.0}, exclude_ids={3})] == [1]
+
+
+def test_recommend_penalizes_missing_experience():
+    index = JobIndex()
+    index.sync(job(1, "python", yoe="8"))
+    index.sync(job(2, "python", yoe="2"))
+
+    assert [job_id for job_id, _ in index.recommend({"python": 1.0}, yoe=3)] == [2, 1]
+
+
+def test_skill_changes_update_postings():
+    index = JobIndex(capacity=2)
+    for job_id in range(1, 20):
+        index.sync(job(job_id, "python"))
+    index.sync(job(5, "go"))
+
+    python_jobs = {job_id for job_id, _ in index.recommend({"python": 1.0}, k=100)}
+    assert 5 not in python_jobs and len(python_jobs) == 18
+    assert index.recommend({"go": 1.0}) == [(5, 1.0)]
+
+
+def test_catch_up_applies_changes_after_load():
+    t0, t1 = datetime(2026, 1, 1, 12, 0, 0), datetime(2026, 1, 1, 12, 1, 0)
+    jobs = FakeJobs([job(1, "python", updated_at=t0), job(2, "python", updated_at=t0)])
+    index = JobIndex()
+    index.load(jobs)
+    assert index.wait_until_loaded(timeout=0)
+
+    jobs.rows = [job(1, "python", is_closed=True, updated_at=t1), job(2, "python", updated_at=t0),
+                 job(3, "python", updated_at=t1)]
+    index.catch_up(jobs, batch_size=1)
+
+    assert sorted(job_id for job_id, _ in index.recommend({"python": 1.0})) == [2, 3]
+    assert index.synced_until == t1
+
+
+def test_refresh_reads_from_the_replica(monkeypatch):
+    from flask import Flask
+    from models import db, job_model
+
+    replica = object()
+    connections = []
+    jobs = FakeJobs([job(1, "python", updated_at=datetime(2026, 1, 1))])
+
+    def repository(connection=None):
+        connections.append(connection)
+        return jobs
+
+    monkeypatch.setattr(db, "get_replica_connection", lambda: replica)
+    monkeypatch.setattr(job_model, "JobRepository", repository)
+    index = JobIndex()
+    assert not index.wait_until_loaded(timeout=0)
+
+    index.refresh(Flask(__name__))
+    assert connections == [replica]
+    assert index.wait_until_loaded(timeout=0) and len(index) == 1
@@ -0,0 +1,39 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from models.job_model import JobRepository
+from utils.salary import parse_salary, salary_filter
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12-15 LPA", (1200000.0, 1500000.0, "INR", "year")),
+    ("$120k - $150k/yr", (120000.0, 150000.0, "USD", "year")),
+    ("50,000 per month", (600000.0, 600000.0, None, "month")),
+])
+def test_parse_salary(text, expected):
+    salary = parse_salary(text)
+    assert (salary["salary_min"], salary["salary_max"], salary["salary_currency"], salary["salary_period"]) == expected
+
+
+@pytest.mark.parametrize("args, sort", [
+    ({"min_salary": "100000"}, None),
+    ({"max_salary": "100000"}, "newest"),
+    ({}, "salary"),
+])
+def test_salary_filter_requires_currency(args, sort):
+    with pytest.raises(ValueError):
+        salary_filter(MultiDict(args), sort)
+
+
+def test_salary_filter_normalizes_currency():
+    assert salary_filter(MultiDict({"min_salary": "10", "currency": " usd"}), "salary") == {
+        "min_salary": 10.0, "currency": "USD"}
+    assert salary_filter(MultiDict({}), "newest") is None
+    with pytest.raises(ValueError):
+        salary_filter(MultiDict({"currency": "dollars"}))
+
+
+def test_salary_sort_filters_on_currency_first():
+    sql, params = JobRepository.page_query(10, 0, salary={"currency": "INR", "min_salary": 5.0}, sort="salary")
+    assert "salary_currency = %s AND salary_max >= %s" in sql
+    assert params == ["INR", 5.0, 10, 0]
@@ -0,0 +1,87 @@
+import pytest
+
+from models.saved_search_model import SavedSearchRepository
+from tests.fakes import SqliteConnection
+
+SCHEMA = """
+CREATE TABLE saved_searches (
+    id INTEGER PRIMARY KEY, user_id INT, name TEXT, skill TEXT, min_yoe INT, max_yoe INT, work_mode TEXT,
+    location_city TEXT, min_salary REAL, salary_currency TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE saved_search_matches (
+    id INTEGER PRIMARY KEY, user_id INT, saved_search_id INT, job_id INT,
+    matched_at TEXT DEFAULT CURRENT_TIMESTAMP, UNIQUE (saved_search_id, job_id)
+);
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, work_mode TEXT, yoe TEXT, salary TEXT,
+    posted_at TEXT
+);
+"""
+
+
+@pytest.fixture
+def repo():
+    return SavedSearchRepository(SqliteConnection(SCHEMA))
+
+
+def job(job_id=1, skills="Python, SQL", yoe="3", work_mode="onsite", city="Pune", currency="INR", salary_max=1500000):
+    return {"id": job_id, "is_closed": False, "skills": skills, "yoe": yoe, "work_mode": work_mode,
+            "location_city": city, "salary_currency": currency, "salary_max": salary_max}
+
+
+def matched(repo, posting):
+    repo.match_job(posting)
+    rows = repo.fetchall("SELECT saved_search_id FROM saved_search_matches WHERE job_id = %s ORDER BY saved_search_id",
+                         (posting["id"],))
+    return [row["saved_search_id"] for row in rows]
+
+
+def save(repo, **search):
+    return repo.create(1, {"skill": "python", **search})
+
+
+def test_skill_must_be_one_of_the_jobs_skills(repo):
+    python, sql, go = save(repo), save(repo, skill="sql"), save(repo, skill="go")
+    assert matched(repo, job()) == [python, sql]
+    assert go not in matched(repo, job(job_id=2, skills="Python"))
+
+
+def test_yoe_bounds_only_match_numeric_yoe(repo):
+    within = save(repo, min_yoe=2, max_yoe=5)
+    save(repo, min_yoe=4)
+    save(repo, max_yoe=2)
+    assert matched(repo, job(yoe="3")) == [within]
+    assert matched(repo, job(job_id=2, yoe="senior")) == []
+
+
+def test_city_matches_exactly_unless_the_job_is_remote(repo):
+    pune, mumbai = save(repo, location_city="Pune"), save(repo, location_city="Mumbai")
+    assert matched(repo, job(city="Pune")) == [pune]
+    assert matched(repo, job(job_id=2, city=None, work_mode="remote")) == [pune, mumbai]
+
+
+def test_min_salary_only_matches_the_same_currency(repo):
+    inr = save(repo, min_salary=1000000, salary_currency="INR")
+    save(repo, min_salary=1000000, salary_currency="USD")
+    save(repo, min_salary=2000000, salary_currency="INR")
+    assert matched(repo, job()) == [inr]
+
+
+def test_closed_jobs_and_jobs_without_skills_match_nothing(repo):
+    save(repo)
+    assert matched(repo, {**job(), "is_closed": True}) == []
+    assert matched(repo, job(job_id=2, skills=" , ")) == []
+
+
+def test_inbox_pages_forward_through_every_match_after_after_id(repo):
+    for job_id in range(1, 6):
+        repo.execute("INSERT INTO jobs (id, title) VALUES (%s, %s)", (job_id, f"job {job_id}"))
+        repo.execute("INSERT INTO saved_search_matches (user_id, saved_search_id, job_id) VALUES (1, 1, %s)", (job_id,))
+
+    assert [m["id"] for m in repo.inbox(1, limit=2)] == [5, 4]
+    # a client that last saw match 1 gets 2..5 in order, two at a time, without skipping any
+    seen, after_id = [], 1
+    while page := repo.inbox(1, limit=2, after_id=after_id):
+        seen += [m["id"] for m in page]
+        after_id = page[-1]["id"]
+    assert seen == [2, 3, 4, 5]
@@ -0,0 +1,42 @@
+import pytest
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+from routes.job_routes import is_unfiltered, parse_search
+
+
+@pytest.fixture(autouse=True)
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+
+def location(**args):
+    filters, _, _ = parse_search(MultiDict(args))
+    return filters["location"]
+
+
+def test_city_and_region_are_resolved_through_the_gazetteer():
+    assert location(city="bangalore") == {"city": "Bengaluru"}
+    assert location(region="maharashtra") == {"region": "Maharashtra"}
+    assert location() is None
+
+
+def test_unknown_places_are_rejected():
+    with pytest.raises(ValueError, match="Unknown city"):
+        location(city="Atlantis")
+    with pytest.raises(ValueError, match="Unknown region"):
+        location(region="Narnia")
+
+
+def test_near_needs_a_positive_radius():
+    assert location(near="Pune", radius_km="10")["near"] == (18.5204, 73.8567, 10.0)
+    with pytest.raises(ValueError):
+        location(near="Pune", radius_km="0")
+
+
+def test_only_status_leaves_a_search_unfiltered():
+    filters, _, _ = parse_search(MultiDict({"status": "closed"}))
+    assert is_unfiltered(filters)
+    filters, _, _ = parse_search(MultiDict({"city": "Pune"}))
+    assert not is_unfiltered(filters)
@@ -0,0 +1,58 @@
+from datetime import date
+
+from models.job_model import JobRepository
+from models.stats_model import STATS_SLOTS, StatsRepository
+from tests.fakes import FakeConnection
+
+
+def status_changes(connection):
+    return [(params[0], params[2]) for _, params in connection.find("INSERT INTO stats_job_status")]
+
+
+def test_global_counters_go_to_random_slots():
+    connection = FakeConnection()
+    stats = StatsRepository(connection)
+    for _ in range(50):
+        stats.applications_added(job_id=1)
+
+    slots = {params[0] for _, params in connection.find("INSERT INTO stats_daily_applications")}
+    assert len(slots) > 1 and slots <= set(range(STATS_SLOTS))
+
+
+def test_job_deleted_subtracts_its_applications_per_day():
+    job = {"id": 5, "posted_by": 9, "is_closed": True}
+    connection = FakeConnection(rows=[[{"day": date(2026, 1, 1), "applications": 2},
+                                       {"day": date(2026, 1, 3), "applications": 1}]])
+    StatsRepository(connection).job_deleted(job)
+
+    daily = connection.find("INSERT INTO stats_daily_applications")
+    assert [(params[0], params[2]) for _, params in daily] == [(date(2026, 1, 1), -2), (date(2026, 1, 3), -1)]
+    employer, = connection.find("UPDATE stats_employer_applications")
+    assert employer[1] == (3, 9)
+    assert connection.find("DELETE FROM stats_job_applications")
+    assert status_changes(connection) == [(True, -1)]
+
+
+def test_close_and_reopen_move_jobs_between_status_counters():
+    connection = FakeConnection(results=[(0, 2), (0, 0), (0, 0), (0, 1)])
+    jobs = JobRepository(connection)
+
+    assert jobs.bulk_set_closed([1, 2, 2], True) == 2
+    assert status_changes(connection) == [(True, 2), (False, -2)]
+
+    connection.statements.clear()
+    assert jobs.bulk_set_closed([1], False) == 1
+    assert status_changes(connection) == [(False, 1), (True, -1)]
+
+
+def test_unchanged_status_leaves_counters_alone():
+    connection = FakeConnection(results=[(0, 0)])
+    JobRepository(connection).bulk_set_closed([1], True)
+    assert status_changes(connection) == []
+
+
+def test_dashboard_reads_sum_the_slots():
+    connection = FakeConnection(rows=[[{"is_closed": 0, "jobs": 7}, {"is_closed": 1, "jobs": 2}]])
+    assert StatsRepository(connection).jobs_by_status() == {"open": 7, "closed": 2}
+    sql, _ = connection.statements[0]
+    assert "SUM(jobs)" in sql and "GROUP BY is_closed" in sql
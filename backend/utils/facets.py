@@ -0,0 +1,39 @@
+# Folds the rows of JobRepository.facet_query into per-facet counts, and caches the
+# counts for unfiltered searches, which every search page asks for.
+import time
+
+from models.job_model import FACET_EXPRESSIONS, STATUSES
+
+# (status, facets) -> (expires_at, counts). Keys are validated statuses and facet tuples, so it stays small.
+_unfiltered_cache = {}
+
+
+def parse_facets(value):
+    facets = tuple(dict.fromkeys(f.strip() for f in (value or "").split(",") if f.strip()))
+    unknown = [f for f in facets if f not in FACET_EXPRESSIONS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}")
+    return facets
+
+
+# Returns {facet: {value: job count}}, most common values first
+def fold_facets(rows, facets):
+    counts = {facet: {} for facet in facets}
+    for row in sorted(rows, key=lambda row: -row["job_count"]):
+        value = row["facet_value"] if row["facet_value"] is not None else "unspecified"
+        facet_counts = counts[row["facet"]]
+        facet_counts[value] = facet_counts.get(value, 0) + row["job_count"]
+    return counts
+
+
+def get_cached(status, facets):
+    entry = _unfiltered_cache.get((status, facets))
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def set_cached(status, facets, counts, ttl):
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status: {status}")
+    _unfiltered_cache[(status, facets)] = (time.monotonic() + ttl, counts)
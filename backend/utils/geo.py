@@ -0,0 +1,149 @@
+# Location normalization against the local gazetteer file, and geohash helpers for
+# radius search. Jobs store a 9 character geohash, so a radius query becomes a few
+# prefix range scans on that index followed by an exact distance check.
+import csv
+import math
+import os
+from functools import lru_cache
+
+from flask import current_app
+
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_KM_PER_DEGREE = 111.32
+
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'gazetteer.csv')
+
+
+@lru_cache(maxsize=4)
+def load_gazetteer(path):
+    places = {}
+    regions = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            place = {
+                "city": row["city"],
+                "region": row["region"],
+                "country": row["country"],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+            }
+            names = [row["city"]] + [a for a in (row.get("aliases") or "").split("|") if a]
+            for name in names:
+                places.setdefault(name.strip().lower(), place)
+            regions.setdefault(row["region"].strip().lower(), row["region"])
+    return places, regions
+
+
+def _gazetteer():
+    return load_gazetteer(current_app.config.get('GAZETTEER_PATH') or DEFAULT_GAZETTEER)
+
+
+def find_place(name):
+    places, _ = _gazetteer()
+    return places.get(name.strip().lower())
+
+
+# Region name as spelled in the gazetteer (and in jobs.location_region), None if unknown
+def find_region(name):
+    _, regions = _gazetteer()
+    return regions.get(name.strip().lower())
+
+
+# Returns the normalized location columns for free-text input such as "Bangalore, India".
+# Unknown places keep NULL coordinates; a bare region still fills location_region.
+def normalize_location(text):
+    result = {"location_city": None, "location_region": None, "latitude": None, "longitude": None, "geohash": None}
+    if not text:
+        return result
+
+    places, regions = _gazetteer()
+    parts = [p.strip().lower() for p in str(text).split(",") if p.strip()]
+    for part in parts:
+        place = places.get(part)
+        if place:
+            result.update({
+                "location_city": place["city"],
+                "location_region": place["region"],
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "geohash": encode_geohash(place["latitude"], place["longitude"]),
+            })
+            return result
+    for part in parts:
+        if part in regions:
+            result["location_region"] = regions[part]
+            break
+    return result
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+# Size of a geohash cell in degrees (latitude, longitude) for a prefix length.
+# Bits alternate starting with longitude, so longitude gets the extra bit of an odd count.
+def cell_degrees(precision):
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+# Geohash prefixes whose cells cover the circle: the centre cell and its 8 neighbours, at the
+# longest prefix whose cells are at least radius_km tall and wide. The width is taken at the
+# circle's latitude farthest from the equator, where cells are narrowest.
+# An empty prefix (every geohash) is returned when even single-character cells are too small.
+def covering_prefixes(latitude, longitude, radius_km):
+    farthest = min(90.0, abs(latitude) + radius_km / _KM_PER_DEGREE)
+    width_factor = math.cos(math.radians(farthest))
+    precision = 0
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = cell_degrees(p)
+        if lat_step * _KM_PER_DEGREE >= radius_km and lon_step * _KM_PER_DEGREE * width_factor >= radius_km:
+            precision = p
+            break
+    if not precision:
+        return [""]
+
+    # Stepping one cell size away from the centre lands in the neighbouring cell
+    prefixes = set()
+    for dlat in (-lat_step, 0, lat_step):
+        for dlon in (-lon_step, 0, lon_step):
+            lat = max(-90.0, min(90.0, latitude + dlat))
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+# Accepts "lat,lon" or a place name known to the gazetteer
+def parse_near(value):
+    try:
+        lat, lon = (float(v) for v in value.split(","))
+    except ValueError:
+        place = find_place(value)
+        if not place:
+            raise ValueError(f"Unknown location: {value}")
+        return place["latitude"], place["longitude"]
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("near must be a valid latitude,longitude pair")
+    return lat, lon
@@ -0,0 +1,21 @@
+# Keeps derived job data in step with writes to the jobs table: the in-process
+# recommendation index and the saved-search inboxes.
+# Routes call these after a successful write, with the job row as it is now.
+from flask import current_app
+
+from models.saved_search_model import SavedSearchRepository
+from utils.recommender import job_index
+
+
+# After create, update, close or reopen
+def job_saved(job):
+    job_index.sync(job)
+    # The posting is already stored, so a matching failure is logged rather than failing the request
+    try:
+        SavedSearchRepository().match_job(job)
+    except Exception:
+        current_app.logger.exception("Saved search matching failed for job %s", job["id"] if job else None)
+
+
+def job_deleted(job_id):
+    job_index.remove(job_id)
@@ -0,0 +1,117 @@
+# Versioned schema migrations from backend/migrations/NNNN_name.sql, applied in order.
+# Applied versions are recorded in schema_migrations; statements whose table, column or
+# index already exists are skipped, so databases set up by hand can be brought under it.
+import os
+import re
+
+import click
+from flask.cli import AppGroup
+
+from models.db import Repository
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+db_cli = AppGroup('db', help="Schema migrations and index checks")
+
+
+def split_statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                migrations.append((match.group(1), match.group(2), split_statements(f.read())))
+    return migrations
+
+
+def applied_versions(repo):
+    repo.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version CHAR(4) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return {row["version"] for row in repo.fetchall("SELECT version FROM schema_migrations")}
+
+
+# Returns the (version, name) pairs that were applied
+def upgrade(repo):
+    done = applied_versions(repo)
+    applied = []
+    for version, name, statements in load_migrations():
+        if version in done:
+            continue
+        # MySQL commits DDL implicitly, so each migration is recorded right after it runs
+        repo.apply_schema(statements)
+        with repo.transaction():
+            repo.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        applied.append((version, name))
+    return applied
+
+
+# List queries that must be answered in index order, keyed by a readable label: every sort each
+# list endpoint accepts. include_archived merges two index-ordered branches and is not checked.
+def index_checked_queries():
+    from models.application_model import ApplicationRepository
+    from models.job_model import SORT_ORDERS, UNFILTERED_SORTS, JobRepository
+
+    queries = {}
+    for sort in SORT_ORDERS:
+        # sort=salary always comes with a currency
+        salary = {"currency": "USD"} if sort == "salary" else None
+        queries[f"list_jobs sort={sort}"] = JobRepository.page_query(10, 0, salary=salary, sort=sort)
+        queries[f"search_jobs sort={sort}"] = JobRepository.search_query(status='open', salary=salary, sort=sort)
+    # admin list_all_jobs runs the list_jobs query without salary filters
+    for sort in UNFILTERED_SORTS:
+        for status in (None, "open", "closed"):
+            queries[f"list_employer_jobs status={status} sort={sort}"] = JobRepository.page_query(
+                10, 0, posted_by=1, status=status, sort=sort)
+    queries["list_applications"] = ApplicationRepository.page_for_user_query(1, 10, 0)
+    return queries
+
+
+# Returns {label: (keys used, uses filesort)} from EXPLAIN of each checked query
+def explain_queries(repo):
+    results = {}
+    for label, (sql, params) in index_checked_queries().items():
+        plan = repo.fetchall("EXPLAIN " + sql, params)
+        keys = [row.get("key") for row in plan]
+        filesort = any("Using filesort" in (row.get("Extra") or "") for row in plan)
+        results[label] = (keys, filesort)
+    return results
+
+
+### `flask db upgrade`- applies pending migrations
+@db_cli.command('upgrade')
+def upgrade_command():
+    applied = upgrade(Repository())
+    for version, name in applied:
+        print(f"Applied {version}_{name}")
+    if not applied:
+        print("Schema is up to date")
+
+
+### `flask db status`- lists migrations and whether they are applied
+@db_cli.command('status')
+def status_command():
+    done = applied_versions(Repository())
+    for version, name, _ in load_migrations():
+        print(f"{version}_{name}: {'applied' if version in done else 'pending'}")
+
+
+### `flask db check-indexes`- fails if any sorted list query needs a filesort
+@db_cli.command('check-indexes')
+def check_indexes_command():
+    failed = False
+    for label, (keys, filesort) in explain_queries(Repository()).items():
+        print(f"{'FILESORT' if filesort else 'ok':8} {label} (key: {', '.join(str(k) for k in keys)})")
+        failed = failed or filesort
+    if failed:
+        raise click.ClickException("Some list queries are not served in index order")
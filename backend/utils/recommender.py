@@ -0,0 +1,252 @@
+# In-memory index of open jobs used to score recommendations for job seekers.
+# Skills are stored as a sparse job x skill matrix in column form (skill -> row numbers),
+# so scoring a user touches only the columns of their skills and the top-k is picked with NumPy.
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from models.job_model import split_skills
+
+_YOE_RE = re.compile(r"\d+")
+# How far behind its high-water mark catch_up() starts reading
+CATCH_UP_OVERLAP = timedelta(seconds=5)
+
+
+def normalize_skill(skill):
+    return skill.strip().lower()
+
+
+def parse_yoe(yoe):
+    match = _YOE_RE.search(str(yoe)) if yoe is not None else None
+    return float(match.group()) if match else np.nan
+
+
+class JobIndex:
+    # Attributes that belong to the index object itself and survive a reload
+    _PERSISTENT = ('_lock', '_loaded', '_start_lock', '_thread_pid')
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread_pid = None
+        self.loaded_at = None
+        self.synced_until = None  # highest jobs.updated_at applied to the index
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._yoe = np.full(capacity, np.nan, dtype=np.float32)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._row_of = {}      # job_id -> row
+        self._row_skills = []  # row -> frozenset of skills
+        # skill -> rows, as a growable array of which the first _posting_sizes[skill] entries are used
+        self._postings = {}
+        self._posting_sizes = {}
+
+    def __len__(self):
+        return int(self._active[:self._size].sum())
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        self._ids = np.resize(self._ids, capacity)
+        self._yoe = np.resize(self._yoe, capacity)
+        active = np.zeros(capacity, dtype=bool)
+        active[:self._size] = self._active[:self._size]
+        self._active = active
+
+    def _add_posting(self, skill, row):
+        rows = self._postings.get(skill)
+        size = self._posting_sizes.get(skill, 0)
+        if rows is None or size == len(rows):
+            grown = np.empty(max(8, size * 2), dtype=np.int64)
+            if rows is not None:
+                grown[:size] = rows[:size]
+            rows = self._postings[skill] = grown
+        rows[size] = row
+        self._posting_sizes[skill] = size + 1
+
+    # Order within a posting array does not matter, so the last entry fills the gap
+    def _remove_posting(self, skill, row):
+        rows = self._postings[skill]
+        size = self._posting_sizes[skill]
+        i = int(np.flatnonzero(rows[:size] == row)[0])
+        rows[i] = rows[size - 1]
+        self._posting_sizes[skill] = size - 1
+
+    def _posting_array(self, skill):
+        rows = self._postings.get(skill)
+        return rows[:self._posting_sizes[skill]] if rows is not None else np.empty(0, dtype=np.int64)
+
+    def _upsert(self, job_id, yoe, skills):
+        skills = frozenset(normalize_skill(s) for s in skills if s.strip())
+        row = self._row_of.get(job_id)
+        if row is None:
+            if self._size == len(self._ids):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._row_of[job_id] = row
+            self._row_skills.append(frozenset())
+            self._ids[row] = job_id
+
+        old_skills = self._row_skills[row]
+        for skill in old_skills - skills:
+            self._remove_posting(skill, row)
+        for skill in skills - old_skills:
+            self._add_posting(skill, row)
+        self._row_skills[row] = skills
+        self._yoe[row] = parse_yoe(yoe)
+        self._active[row] = True
+
+    def _apply(self, job):
+        if job["is_closed"]:
+            self._deactivate(job["id"])
+        else:
+            self._upsert(job["id"], job["yoe"], split_skills(job["skills"]))
+
+    # Incremental maintenance, called by the routes that create/update/close/reopen/delete jobs.
+    # Closed or deleted jobs only get deactivated, their row is kept for a possible reopen.
+    def sync(self, job):
+        with self._lock:
+            if job is not None:
+                self._apply(job)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._deactivate(job_id)
+
+    def _deactivate(self, job_id):
+        row = self._row_of.get(job_id)
+        if row is not None:
+            self._active[row] = False
+
+    # Full rebuild from the jobs table, streamed in id order so it never holds a huge result set.
+    # Changes made while it runs are picked up by the next catch_up(), which starts from the
+    # updated_at high-water mark read before streaming.
+    def load(self, jobs_repo, batch_size=50000):
+        fresh = JobIndex()
+        fresh.synced_until = jobs_repo.scalar("SELECT MAX(updated_at) FROM jobs")
+        last_id = 0
+        while True:
+            rows = jobs_repo.fetchall("""
+                SELECT id, yoe, skills FROM jobs
+                WHERE is_closed = FALSE AND id > %s
+                ORDER BY id LIMIT %s
+            """, (last_id, batch_size))
+            for row in rows:
+                fresh._upsert(row["id"], row["yoe"], split_skills(row["skills"]))
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]["id"]
+
+        with self._lock:
+            self.__dict__.update({k: v for k, v in fresh.__dict__.items() if k not in self._PERSISTENT})
+            self.loaded_at = time.monotonic()
+        self._loaded.set()
+
+    # Applies jobs created, updated, closed or reopened since the last load or catch-up, through the
+    # updated_at index. Reads back CATCH_UP_OVERLAP before the high-water mark, so rows committed late
+    # with an older updated_at are not missed; applying a row twice is harmless.
+    def catch_up(self, jobs_repo, batch_size=5000):
+        if self.synced_until is None:
+            return
+        since = self.synced_until - CATCH_UP_OVERLAP
+        last_id = 0
+        while True:
+            rows = jobs_repo.fetchall("""
+                SELECT id, yoe, skills, is_closed, updated_at FROM jobs
+                WHERE updated_at >= %s AND NOT (updated_at = %s AND id <= %s)
+                ORDER BY updated_at, id LIMIT %s
+            """, (since, since, last_id, batch_size))
+            if not rows:
+                return
+            with self._lock:
+                for row in rows:
+                    self._apply(row)
+                self.synced_until = max(self.synced_until, rows[-1]["updated_at"])
+            if len(rows) < batch_size:
+                return
+            since, last_id = rows[-1]["updated_at"], rows[-1]["id"]
+
+    def is_stale(self, max_age):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    # Starts the refresh thread of this process, once per process since threads do not survive a fork.
+    # It loads the index, then catches up every refresh_seconds and fully reloads every reload_seconds
+    # to drop jobs deleted by other processes. Requests never rebuild the index themselves.
+    def start(self, app):
+        with self._start_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._refresh_loop, args=(app,), name="jobstack-recommender", daemon=True).start()
+
+    def _refresh_loop(self, app):
+        while True:
+            try:
+                self.refresh(app)
+            except Exception:
+                app.logger.exception("Recommendation index refresh failed")
+            time.sleep(app.config.get('RECOMMENDER_REFRESH_SECONDS', 10))
+
+    # One load or catch-up. Reads from a replica when one is reachable, so every worker's refreshes
+    # stay off the primary; the index then trails the primary by the replication lag at most.
+    def refresh(self, app):
+        from models.db import get_replica_connection
+        from models.job_model import JobRepository
+
+        with app.app_context():
+            jobs_repo = JobRepository(get_replica_connection())
+            if self.is_stale(app.config.get('RECOMMENDER_RELOAD_SECONDS', 3600)):
+                self.load(jobs_repo)
+            else:
+                self.catch_up(jobs_repo)
+
+    # Whether the first load finished, waiting up to timeout seconds for it
+    def wait_until_loaded(self, timeout):
+        return self._loaded.wait(timeout)
+
+    # Returns up to k (job_id, score) pairs, best first.
+    # skill_weights maps skills to weights; jobs sharing no skill with the user are not returned.
+    def recommend(self, skill_weights, yoe=None, exclude_ids=(), k=10):
+        with self._lock:
+            n = self._size
+            if n == 0 or not skill_weights:
+                return []
+
+            scores = np.zeros(n, dtype=np.float32)
+            for skill, weight in skill_weights.items():
+                rows = self._posting_array(normalize_skill(skill))
+                if rows.size:
+                    scores[rows] += weight
+
+            # From here on only the rows sharing a skill with the user are touched
+            rows = np.flatnonzero(scores)
+            rows = rows[self._active[rows]]
+            excluded = [self._row_of[j] for j in exclude_ids if j in self._row_of]
+            if excluded:
+                rows = rows[~np.isin(rows, excluded)]
+            scores = scores[rows] / sum(skill_weights.values())
+
+            # Jobs asking for more experience than the user has lose up to 0.5, unknown yoe is neutral
+            if yoe is not None:
+                with np.errstate(invalid='ignore'):
+                    gap = self._yoe[rows] - yoe
+                    scores -= np.where(gap > 0, np.minimum(gap, 5) * 0.1, 0).astype(np.float32)
+
+            best = np.arange(rows.size)
+            if rows.size > k:
+                best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            return [(int(self._ids[rows[i]]), float(scores[i])) for i in best]
+
+
+# Process-wide index, kept up to date by the writes of this process and by the refresh thread
+# for writes handled by other worker processes.
+job_index = JobIndex()
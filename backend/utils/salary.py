@@ -0,0 +1,82 @@
+# Parses the free-form salary given by employers ("12-15 LPA", "$120k - $150k/yr", "50,000 per month")
+# into annualized numeric bounds, so search can filter and sort on an index.
+import re
+
+SALARY_COLUMNS = ["salary_min", "salary_max", "salary_currency", "salary_period"]
+
+_CURRENCIES = [
+    (re.compile(r"₹|\brs\.?|\binr\b|\blpa\b|\blakhs?\b|\blacs?\b|\bcrores?\b|\d\s*(?:l|cr)\b", re.I), "INR"),
+    (re.compile(r"\busd\b|us\$|\$", re.I), "USD"),
+    (re.compile(r"€|\beur\b", re.I), "EUR"),
+    (re.compile(r"£|\bgbp\b", re.I), "GBP"),
+    (re.compile(r"\bcad\b", re.I), "CAD"),
+    (re.compile(r"\baud\b", re.I), "AUD"),
+    (re.compile(r"\bsgd\b", re.I), "SGD"),
+]
+
+_PERIODS = [
+    (re.compile(r"/\s*h(ou)?r\b|\bper\s+hour\b|\bhourly\b|\bph\b", re.I), "hour"),
+    (re.compile(r"/\s*day\b|\bper\s+day\b|\bdaily\b", re.I), "day"),
+    (re.compile(r"/\s*w(ee)?k\b|\bper\s+week\b|\bweekly\b", re.I), "week"),
+    (re.compile(r"/\s*mo(nth)?\b|\bper\s+month\b|\bmonthly\b|\bpm\b|\bp\.m\.", re.I), "month"),
+]
+
+# Multiplier from a period's amount to a yearly amount
+ANNUAL_FACTOR = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+
+_AMOUNT = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)\s*(lpa|lakhs?|lacs?|l|crores?|cr|k|mn|million|m)?\b", re.I)
+_MULTIPLIERS = {"k": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6, "l": 1e5, "lpa": 1e5, "lakh": 1e5,
+                "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7}
+
+
+# Returns a dict with SALARY_COLUMNS as keys. Amounts are per year in salary_currency,
+# salary_period keeps the period the salary was posted in. Everything is None when no amount is found.
+def parse_salary(value):
+    result = dict.fromkeys(SALARY_COLUMNS)
+    if value is None or isinstance(value, bool):
+        return result
+    if isinstance(value, (int, float)):
+        result.update(salary_min=float(value), salary_max=float(value), salary_period="year")
+        return result
+
+    text = str(value)
+    amounts = []
+    for number, unit in _AMOUNT.findall(text):
+        amount = float(number.replace(",", ""))
+        amounts.append([amount, _MULTIPLIERS.get(unit.lower()) if unit else None])
+    if not amounts:
+        return result
+    amounts = amounts[:2]
+    # "10-15k" applies the unit of the upper bound to the lower one
+    if len(amounts) == 2 and amounts[0][1] is None:
+        amounts[0][1] = amounts[1][1]
+    values = [amount * (multiplier or 1) for amount, multiplier in amounts]
+
+    period = next((name for pattern, name in _PERIODS if pattern.search(text)), "year")
+    currency = next((code for pattern, code in _CURRENCIES if pattern.search(text)), None)
+    factor = ANNUAL_FACTOR[period]
+    result.update(
+        salary_min=round(min(values) * factor, 2),
+        salary_max=round(max(values) * factor, 2),
+        salary_currency=currency,
+        salary_period=period,
+    )
+    return result
+
+
+# Reads min_salary, max_salary and currency from request args, None when none are given.
+# Amounts are only comparable within one currency, so salary bounds and sort=salary require
+# currency (ValueError otherwise); the filter then keeps only postings in that currency.
+def salary_filter(args, sort=None):
+    salary = {
+        "min_salary": args.get('min_salary', type=float),
+        "max_salary": args.get('max_salary', type=float),
+        "currency": (args.get('currency', default='', type=str)).strip().upper(),
+    }
+    salary = {k: v for k, v in salary.items() if v is not None and v != ""}
+    if "currency" not in salary and (salary or sort == "salary"):
+        raise ValueError("currency is required with min_salary, max_salary and sort=salary")
+    if "currency" in salary and not re.fullmatch(r"[A-Z]{3}", salary["currency"]):
+        raise ValueError("currency must be a 3 letter code, e.g. INR or USD")
+    return salary or None